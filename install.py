@@ -5,24 +5,25 @@ OpsPilot Installation Script
 Sets up OpsPilot as an installable Python package.
 """
 
+import importlib.metadata
 import os
 import sys
+import shutil
 import subprocess
+import sysconfig
 from pathlib import Path
 
 
-def run_command(cmd, description):
+def run_command(cmd: list[str], description: str) -> bool:
     """Run a command and handle errors."""
     print(f"🔄 {description}...")
     try:
-        result = subprocess.run(
-            cmd, shell=True, check=True, capture_output=True, text=True
-        )
+        subprocess.run(cmd, check=True, text=True)
         print(f"✅ {description} completed")
-        return result.stdout
-    except subprocess.CalledProcessError as e:
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
         print(f"❌ {description} failed: {e}")
-        return None
+        return False
 
 
 def main():
@@ -41,20 +42,24 @@ def main():
     current_dir = Path.cwd()
 
     print(f"\n📦 Installing OpsPilot in development mode...")
-    run_command(f'pip install -e "{current_dir}"', "Development installation")
+    if not run_command(
+        [sys.executable, "-m", "pip", "install", "-e", str(current_dir)],
+        "Development installation",
+    ):
+        sys.exit(1)
 
-    # Verify installation
+    # Verify installation by checking pip registered the package with this
+    # interpreter; its scripts directory need not be on PATH
     print("\n🔍 Verifying installation...")
     try:
-        result = subprocess.run(
-            "opspilot --help", shell=True, capture_output=True, text=True
-        )
-        if result.returncode == 0:
-            print("✅ OpsPilot successfully installed!")
-        else:
-            print("❌ Installation verification failed")
-    except Exception as e:
-        print(f"❌ Could not verify installation: {e}")
+        version = importlib.metadata.version("opspilot")
+    except importlib.metadata.PackageNotFoundError:
+        print("❌ Installation verification failed")
+    else:
+        print(f"✅ OpsPilot {version} successfully installed!")
+        if not shutil.which("opspilot"):
+            scripts_dir = sysconfig.get_path("scripts")
+            print(f"⚠️  Add {scripts_dir} to your PATH to run the opspilot command")
 
     print("\n📋 Next steps:")
     print("1. Run: opspilot start")
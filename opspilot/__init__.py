@@ -4,7 +4,7 @@ OpsPilot - AI-powered DevOps Assistant
 A sophisticated CLI tool for DevOps operations with AI assistance.
 """
 
-from .main import cli
+from typing import Any
 
 __version__ = "0.2.1"
 __author__ = "OpsPilot Team"
@@ -12,3 +12,12 @@ __email__ = "team@opspilot.com"
 __description__ = "AI-powered DevOps assistant with Plan/Build modes"
 
 __all__ = ["cli", "__version__"]
+
+
+def __getattr__(name: str) -> Any:
+    # The CLI pulls in the whole TUI, so only import it when asked for
+    if name == "cli":
+        from .main import cli
+
+        return cli
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,6 +4,6 @@ OpsPilot Agent Module
 Contains the agent core and related components.
 """
 
-from .core import AgentCore, AgentMode
+from .core import AgentCore, AgentMode, get_agent_core
 
-__all__ = ["AgentCore", "AgentMode"]
+__all__ = ["AgentCore", "AgentMode", "get_agent_core"]
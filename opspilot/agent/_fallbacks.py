@@ -0,0 +1,56 @@
+"""
+OpsPilot litellm Fallbacks
+
+Stand-ins for the litellm calls the agent makes, used for development
+when litellm isn't installed.
+"""
+
+from typing import Any, AsyncIterator, List
+
+
+class MockMessage:
+    def __init__(self) -> None:
+        self.content = "Mock response - litellm not installed"
+        self.tool_calls = None
+
+
+class MockChoice:
+    @property
+    def message(self) -> MockMessage:
+        return MockMessage()
+
+
+class MockResponse:
+    @property
+    def choices(self) -> List[MockChoice]:
+        return [MockChoice()]
+
+
+class MockStreamChoice:
+    @property
+    def delta(self) -> MockMessage:
+        return MockMessage()
+
+
+class MockChunk:
+    @property
+    def choices(self) -> List[MockStreamChoice]:
+        return [MockStreamChoice()]
+
+
+async def mock_stream() -> AsyncIterator[MockChunk]:
+    yield MockChunk()
+
+
+async def mock_acompletion(*args: Any, **kwargs: Any) -> Any:
+    if kwargs.get("stream"):
+        return mock_stream()
+    return MockResponse()
+
+
+def mock_completion_cost(*args: Any, **kwargs: Any) -> float:
+    return 0.0
+
+
+def mock_stream_chunk_builder(*args: Any, **kwargs: Any) -> MockResponse:
+    return MockResponse()
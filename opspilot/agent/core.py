@@ -5,287 +5,246 @@ Implements the Think-Act loop with Plan/Build mode switching.
 Manages AI interactions and tool orchestration.
 """
 
+import asyncio
+import functools
+import inspect
+import itertools
 import json
-from typing import List, Dict, Any, Optional, Literal, Callable
+import logging
+import threading
+from collections import deque
+from types import MappingProxyType
+from typing import (
+    List,
+    Mapping,
+    Dict,
+    Any,
+    Optional,
+    Literal,
+    Callable,
+    Deque,
+    Tuple,
+)
 from dataclasses import dataclass
 from enum import Enum
 
+from ..config import get_config_manager
+from .response_cache import (
+    CachedResponse,
+    ResponseCache,
+    hash_tools,
+    make_cache_key,
+)
+from .store import ConversationStore
+from .tokens import estimate_tokens
+
 try:
-    from litellm import acompletion, completion, completion_cost
+    import orjson
+
+    _json_loads: Callable[[Any], Any] = orjson.loads
 except ImportError:
-    # Fallback for development
-    class MockMessage:
-        def __init__(self) -> None:
-            self.content = "Mock response - litellm not installed"
-            self.tool_calls = None
+    _json_loads = json.loads
 
-    class MockChoice:
-        @property
-        def message(self) -> MockMessage:
-            return MockMessage()
+logger = logging.getLogger(__name__)
 
-    class MockResponse:
-        @property
-        def choices(self) -> List[MockChoice]:
-            return [MockChoice()]
 
-    async def acompletion(*args: Any, **kwargs: Any) -> MockResponse:
-        return MockResponse()
+# litellm pulls in a very heavy dependency tree, so it is imported on first
+# use rather than at module import time.
+_acompletion: Optional[Callable[..., Any]] = None
+_completion_cost: Optional[Callable[..., float]] = None
+_stream_chunk_builder: Optional[Callable[..., Any]] = None
 
-    def sync_completion(*args: Any, **kwargs: Any) -> MockResponse:
-        return MockResponse()
 
-    def completion(*args: Any, **kwargs: Any) -> Any:
-        class MockResponse:
-            def choice(self) -> Dict[str, Any]:
-                return {"message": {"content": "Mock response - litellm not installed"}}
+# Serializes the import, which may run in a warmup thread and a worker at once
+_litellm_lock = threading.Lock()
 
-        return MockResponse()
 
-    def completion_cost(*args: Any, **kwargs: Any) -> float:
-        return 0.0
+def _load_litellm() -> None:
+    """Import litellm, falling back to mocks for development."""
+    global _acompletion, _completion_cost, _stream_chunk_builder
 
+    with _litellm_lock:
+        if _acompletion is not None:
+            return
 
-from ..config import config_manager
+        try:
+            from litellm import acompletion, completion_cost, stream_chunk_builder
 
+            _completion_cost = completion_cost
+            _stream_chunk_builder = stream_chunk_builder
+            _acompletion = acompletion
+        except ImportError:
+            from . import _fallbacks
 
-class AgentMode(Enum):
-    """Agent operation modes."""
+            _completion_cost = _fallbacks.mock_completion_cost
+            _stream_chunk_builder = _fallbacks.mock_stream_chunk_builder
+            _acompletion = _fallbacks.mock_acompletion
 
-    PLAN = "plan"
-    BUILD = "build"
 
+def _prepare_first_request() -> None:
+    """Do the blocking one-off setup the first request needs."""
+    _load_litellm()
+    estimate_tokens("")
 
-@dataclass
-class Tool:
-    """Represents an available tool for the agent."""
 
-    name: str
-    description: str
-    parameters: Dict[str, Any]
-    function: Callable
-    requires_build_mode: bool = False
+def _get_acompletion() -> Callable[..., Any]:
+    """Get litellm's acompletion, importing litellm on first use."""
+    if _acompletion is None:
+        _load_litellm()
+    return _acompletion  # type: ignore[return-value]
 
 
-@dataclass
-class Message:
-    """Represents a chat message."""
+def _get_completion_cost() -> Callable[..., float]:
+    """Get litellm's completion_cost, importing litellm on first use."""
+    if _completion_cost is None:
+        _load_litellm()
+    return _completion_cost  # type: ignore[return-value]
 
-    role: Literal["user", "assistant", "system", "tool"]
-    content: str
-    tool_calls: Optional[List[Dict[str, Any]]] = None
-    tool_call_id: Optional[str] = None
 
+def _get_stream_chunk_builder() -> Callable[..., Any]:
+    """Get litellm's stream_chunk_builder, importing litellm on first use."""
+    if _stream_chunk_builder is None:
+        _load_litellm()
+    return _stream_chunk_builder  # type: ignore[return-value]
 
-class AgentCore:
-    """Core agent logic implementing Think-Act loop."""
 
-    def __init__(self, launch_config: Any = None) -> None:
-        self.config = config_manager.load_config()
-        self.launch_config = launch_config  # TUI launch config with API keys
-        self.mode = AgentMode.PLAN
-        self.tools: Dict[str, Tool] = {}
-        self.messages: List[Message] = []
-        self.usage_stats = {
-            "total_tokens": 0,
-            "total_cost": 0.0,
-            "requests_count": 0,
-            "current_context_tokens": 0,
-        }
-        self._setup_default_tools()
+# Per-token (prompt, completion) rates by model, filled from litellm's price map
+_COST_TABLE: Dict[str, Tuple[float, float]] = {}
 
-    def _setup_default_tools(self) -> None:
-        """Setup default tools based on available modules."""
-        # These will be populated when tools are imported
-        pass
 
-    def _track_usage(self, response: Any) -> None:
-        """Track usage statistics from litellm response."""
+def _get_cost_rates(model: str) -> Optional[Tuple[float, float]]:
+    """Get per-token (prompt, completion) rates for a model, if known."""
+    rates = _COST_TABLE.get(model)
+    if rates is None:
         try:
-            # Extract usage information
-            usage = getattr(response, "usage", None)
-            if usage:
-                # Get token counts
-                prompt_tokens = getattr(usage, "prompt_tokens", 0)
-                total_tokens = getattr(usage, "total_tokens", 0)
-
-                # Update statistics
-                self.usage_stats["total_tokens"] += total_tokens
-                self.usage_stats["requests_count"] += 1
+            from litellm import model_cost
+        except ImportError:
+            return None
 
-                # Calculate cost using LiteLLM's built-in pricing
-                cost = completion_cost(completion_response=response)
-                self.usage_stats["total_cost"] += cost
-
-                # Update current context tokens (approximate)
-                self.usage_stats["current_context_tokens"] = prompt_tokens
-
-        except Exception:
-            # Don't fail if usage tracking fails
-            pass
-
-    def register_tool(self, tool: Any) -> None:
-        """Register a new tool with the agent."""
-        if isinstance(tool, dict):
-            tool_obj = Tool(**tool)
-        else:
-            tool_obj = tool
-        self.tools[tool_obj.name] = tool_obj
+        info = model_cost.get(model)
+        if not info:
+            return None
 
-    def get_available_tools(self) -> List[Dict[str, Any]]:
-        """Get list of available tools based on current mode."""
-        available_tools = []
-
-        for tool in self.tools.values():
-            if tool.requires_build_mode and self.mode == AgentMode.PLAN:
-                continue
-
-            available_tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.parameters,
-                    },
-                }
-            )
-
-        return available_tools
-
-    def switch_mode(self, mode: AgentMode) -> None:
-        """Switch between Plan and Build modes."""
-        self.mode = mode
-
-    def add_message(
-        self,
-        role: Literal["user", "assistant", "system", "tool"],
-        content: str,
-        tool_calls: Optional[List[Dict[str, Any]]] = None,
-        tool_call_id: Optional[str] = None,
-    ) -> None:
-        """Add a message to the conversation history."""
-        message = Message(
-            role=role, content=content, tool_calls=tool_calls, tool_call_id=tool_call_id
+        rates = (
+            info.get("input_cost_per_token") or 0.0,
+            info.get("output_cost_per_token") or 0.0,
         )
-        self.messages.append(message)
+        _COST_TABLE[model] = rates
+    return rates
+
+
+def _price_usage(response: Any) -> Optional[Tuple[int, int, float]]:
+    """Get a response's prompt tokens, total tokens and cost, if reported."""
+    try:
+        usage = response.usage
+        prompt_tokens = usage.prompt_tokens or 0
+        completion_tokens = usage.completion_tokens or 0
+        total_tokens = usage.total_tokens or 0
+    except AttributeError:
+        # No usage reported (e.g. the development mock), nothing to price
+        return None
+
+    try:
+        # Calculate cost from the flat rate table, falling back to
+        # LiteLLM's full pricing logic for models it doesn't list
+        rates = _get_cost_rates(getattr(response, "model", None) or "")
+        if rates:
+            cost = prompt_tokens * rates[0] + completion_tokens * rates[1]
+        else:
+            cost = _get_completion_cost()(completion_response=response)
+    except Exception:
+        # Don't fail if pricing is unavailable for the model
+        cost = 0.0
 
-    async def think(self, user_input: str, selected_model: Any = None) -> str:
-        """Process user input and generate a response (Think phase)."""
-        # Add user message to history
-        self.add_message("user", user_input)
+    return prompt_tokens, total_tokens, cost
 
-        # Get system prompt based on mode
-        system_prompt = self._get_system_prompt()
 
-        # Prepare messages for AI
-        messages = [
-            {"role": "system", "content": system_prompt},
-            *[{"role": msg.role, "content": msg.content} for msg in self.messages],
-        ]
+def _create_http_client() -> Any:
+    """Create a connection-pooled HTTP session for LLM requests.
 
-        # Get available tools
-        tools = self.get_available_tools()
-
-        # Determine model to use
-        if selected_model:
-            model_name = selected_model.name
-            provider = selected_model.provider
-        else:
-            model_name = config_manager.get_model_for_mode(self.mode.value)
-            provider = None
+    Must be called with the event loop the session will be used on running.
+    """
+    import aiohttp
 
-        # Get API key for the provider if using TUI config
-        litellm_kwargs = config_manager.get_litellm_config()
-        if self.launch_config and provider:
-            api_key = self.launch_config.get_api_key_for_provider(provider)
-            if api_key:
-                litellm_kwargs["api_key"] = api_key
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=64, keepalive_timeout=30.0),
+        timeout=aiohttp.ClientTimeout(total=600.0, connect=5.0),
+    )
 
-        try:
-            # Call AI model
-            response = await acompletion(
-                model=model_name,
-                messages=messages,
-                tools=tools if tools else None,
-                tool_choice="auto" if tools else None,
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature,
-                **litellm_kwargs,
-            )
 
-            # Extract response content
-            assistant_message = response.choices[0].message
+@functools.lru_cache(maxsize=None)
+def _accepts_shared_session(acompletion: Callable[..., Any]) -> bool:
+    """Whether an acompletion takes a per-request HTTP session."""
+    try:
+        return "shared_session" in inspect.signature(acompletion).parameters
+    except (TypeError, ValueError):
+        return False
 
-            # Track usage statistics
-            self._track_usage(response)
 
-            # Add assistant response to history
-            self.add_message(
-                "assistant",
-                assistant_message.content or "",
-                assistant_message.tool_calls,
-            )
+# Default token budget for the conversation history sent to the model
+DEFAULT_CONTEXT_TOKENS = 8000
 
-            return assistant_message.content or ""
+# Messages kept in memory when history is persisted to a store
+RECENT_MESSAGES = 50
 
-        except Exception as e:
-            error_msg = f"AI Error: {str(e)}"
-            self.add_message("assistant", error_msg)
-            return error_msg
 
-    async def act(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Execute tool calls (Act phase)."""
-        results = []
+# Default number of recent user/assistant turns sent to the model
+DEFAULT_CONTEXT_TURNS = 20
 
-        for tool_call in tool_calls:
-            tool_name = tool_call["function"]["name"]
-            tool_args = json.loads(tool_call["function"]["arguments"])
-            tool_call_id = tool_call.get("id", "unknown")
+# Usage statistics for a fresh session
+_EMPTY_USAGE: Mapping[str, Any] = MappingProxyType(
+    {
+        "total_tokens": 0,
+        "total_cost": 0.0,
+        "requests_count": 0,
+        "current_context_tokens": 0,
+        "cache_hits": 0,
+        "saved_tokens": 0,
+    }
+)
 
-            try:
-                # Execute tool
-                tool = self.tools[tool_name]
-                result = await tool.function(**tool_args)
 
-                # Add tool result message
-                self.add_message("tool", str(result), tool_call_id=tool_call_id)
+def _estimate_message_tokens(message: Dict[str, Any]) -> int:
+    """Token estimate for an API message, including tool call metadata."""
+    tokens = estimate_tokens(message["content"])
+    tool_calls = message.get("tool_calls")
+    if tool_calls:
+        tokens += estimate_tokens(json.dumps(tool_calls, default=str))
+    return tokens
 
-                results.append({"tool_call_id": tool_call_id, "result": str(result)})
 
-            except Exception as e:
-                error_result = f"Tool Error: {str(e)}"
+class AgentMode(Enum):
+    """Agent operation modes."""
 
-                self.add_message("tool", error_result, tool_call_id=tool_call_id)
+    PLAN = "plan"
+    BUILD = "build"
 
-                results.append({"tool_call_id": tool_call_id, "result": error_result})
 
-        return results
+@dataclass(slots=True, frozen=True)
+class Tool:
+    """Represents an available tool for the agent."""
 
-    async def process(self, user_input: str, selected_model: Any = None) -> str:
-        """Main Think-Act loop processing."""
-        # Think phase
-        response = await self.think(user_input, selected_model=selected_model)
+    name: str
+    description: str
+    parameters: Dict[str, Any]
+    function: Callable
+    requires_build_mode: bool = False
+    # Only read-only tools should opt in to running alongside other calls
+    parallel_safe: bool = False
 
-        # Check if there are tool calls to execute
-        last_message = self.messages[-1] if self.messages else None
-        if last_message and last_message.tool_calls:
-            # Act phase
-            await self.act(last_message.tool_calls)
 
-            # Think again with tool results
-            response = await self.think(
-                "", selected_model=selected_model
-            )  # Empty input to continue conversation
+@dataclass(slots=True, frozen=True)
+class Message:
+    """Represents a chat message."""
 
-        return response
+    role: Literal["user", "assistant", "system", "tool"]
+    content: str
+    tool_calls: Optional[List[Dict[str, Any]]] = None
+    tool_call_id: Optional[str] = None
 
-    def _get_system_prompt(self) -> str:
-        """Get system prompt based on current mode."""
-        if self.mode == AgentMode.PLAN:
-            return """You are OpsPilot, an expert DevOps/SRE engineer assistant in PLAN MODE.
 
-IDENTITY & EXPERTISE:
+# Identity shared by both modes' system prompts
+_IDENTITY_BLOCK = """IDENTITY & EXPERTISE:
 You are a seasoned DevOps engineer with deep expertise in:
 - Infrastructure automation (Terraform, Ansible, CloudFormation, Pulumi)
 - Container orchestration (Kubernetes, Docker, ECS, Docker Swarm)
@@ -295,7 +254,11 @@ You are a seasoned DevOps engineer with deep expertise in:
 - Configuration management & GitOps practices
 - Security best practices, compliance, and hardening
 - High availability, disaster recovery, and incident response
-- Performance optimization and cost management
+- Performance optimization and cost management"""
+
+_PLAN_PROMPT = f"""You are OpsPilot, an expert DevOps/SRE engineer assistant in PLAN MODE.
+
+{_IDENTITY_BLOCK}
 
 PLAN MODE CAPABILITIES:
 - Read and analyze configuration files, logs, and infrastructure code
@@ -357,20 +320,9 @@ COMMUNICATION STYLE:
 
 When your plan is ready, inform the user they can switch to BUILD MODE to execute it."""
 
-        else:  # BUILD MODE
-            return """You are OpsPilot, an expert DevOps/SRE engineer assistant in BUILD MODE.
+_BUILD_PROMPT = f"""You are OpsPilot, an expert DevOps/SRE engineer assistant in BUILD MODE.
 
-IDENTITY & EXPERTISE:
-You are a seasoned DevOps engineer with deep expertise in:
-- Infrastructure automation (Terraform, Ansible, CloudFormation, Pulumi)
-- Container orchestration (Kubernetes, Docker, ECS, Docker Swarm)
-- CI/CD pipelines (Jenkins, GitLab CI, GitHub Actions, ArgoCD, Flux)
-- Cloud platforms (AWS, Azure, GCP, DigitalOcean)
-- Monitoring & observability (Prometheus, Grafana, ELK, Datadog, New Relic)
-- Configuration management & GitOps practices
-- Security best practices, compliance, and hardening
-- High availability, disaster recovery, and incident response
-- Performance optimization and cost management
+{_IDENTITY_BLOCK}
 - Scripting (Bash, Python, Go) and automation
 
 BUILD MODE CAPABILITIES:
@@ -449,9 +401,596 @@ EFFICIENCY TIPS:
 - Automate repetitive tasks
 - Think about long-term maintainability"""
 
+# System prompts per mode, kept byte-identical across requests so provider-side
+# prompt caching can apply
+_SYSTEM_PROMPTS: Dict[AgentMode, str] = {
+    AgentMode.PLAN: _PLAN_PROMPT,
+    AgentMode.BUILD: _BUILD_PROMPT,
+}
+
+
+_SYSTEM_MESSAGES: Dict[AgentMode, Dict[str, str]] = {
+    mode: {"role": "system", "content": prompt}
+    for mode, prompt in _SYSTEM_PROMPTS.items()
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _system_prompt_tokens(mode: AgentMode) -> int:
+    """Estimated token length of a mode's system prompt, counted once."""
+    return estimate_tokens(_SYSTEM_PROMPTS[mode])
+
+
+class AgentCore:
+    """Core agent logic implementing Think-Act loop."""
+
+    def __init__(
+        self, launch_config: Any = None, store: Optional[ConversationStore] = None
+    ) -> None:
+        self.config = get_config_manager().load_config()
+        self.launch_config = launch_config  # TUI launch config with API keys
+        self.mode = AgentMode.PLAN
+        # Configured model per mode, resolved on first use
+        self._model_cache: Dict[AgentMode, str] = {}
+        self.tools: Dict[str, Tool] = {}
+        # Tool definitions per mode, rebuilt only when tools change
+        self._tools_cache: Dict[AgentMode, List[Dict[str, Any]]] = {}
+        self._tools_hash_cache: Dict[AgentMode, str] = {}
+        self.messages: List[Message] = []
+        # History in OpenAI format, maintained incrementally by add_message
+        self._api_messages: Deque[Dict[str, Any]] = deque()
+        # Each message's count, so dropping it subtracts what adding it added
+        self._api_message_tokens: Deque[int] = deque()
+        self._api_tokens = 0
+        # Sliding window of history sent with each request
+        self.context_window_turns = DEFAULT_CONTEXT_TURNS
+        self.context_token_budget = DEFAULT_CONTEXT_TOKENS
+        # Updated in place, so the read-only view always reflects it
+        self.usage_stats: Dict[str, Any] = dict(_EMPTY_USAGE)
+        self._usage_view: Mapping[str, Any] = MappingProxyType(self.usage_stats)
+        self.response_cache: Optional[ResponseCache] = (
+            ResponseCache() if self.config.cache_enabled else None
+        )
+        # Pooled HTTP client, bound to the event loop it was created on
+        self._http_client: Any = None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Persistent history; only the most recent messages stay in memory
+        if store is None and self.config.persist_history:
+            store = ConversationStore()
+        self.store = store
+        if self.store is not None:
+            self._load_from_store()
+        self._setup_default_tools()
+
+    def _load_from_store(self) -> None:
+        """Resume the recent history and usage statistics from the store."""
+        assert self.store is not None
+        for row in self.store.recent(RECENT_MESSAGES):
+            self._append_message(Message(**row))
+        self.usage_stats.update(self.store.load_usage())
+
+    def _setup_default_tools(self) -> None:
+        """Setup default tools based on available modules."""
+        # These will be populated when tools are imported
+        pass
+
+    async def _track_usage(self, response: Any) -> None:
+        """Track usage statistics from litellm response."""
+        # Pricing may block, so it runs in a worker thread; the stats are
+        # only updated here on the loop, where their live view is read
+        usage = await asyncio.to_thread(_price_usage, response)
+        if usage is None:
+            return
+        prompt_tokens, total_tokens, cost = usage
+
+        # Update statistics
+        stats = self.usage_stats
+        stats["total_tokens"] += total_tokens
+        stats["requests_count"] += 1
+
+        # Update current context tokens (approximate)
+        stats["current_context_tokens"] = prompt_tokens
+        stats["total_cost"] += cost
+
+        if self.store is not None:
+            # A snapshot, so the write can't see later updates half-applied
+            await asyncio.to_thread(self.store.save_usage, dict(stats))
+
+    def register_tool(self, tool: Any) -> None:
+        """Register a new tool with the agent."""
+        if isinstance(tool, dict):
+            tool_obj = Tool(**tool)
+        else:
+            tool_obj = tool
+        self.tools[tool_obj.name] = tool_obj
+        self._tools_cache.clear()
+        self._tools_hash_cache.clear()
+
+    def get_available_tools(self) -> List[Dict[str, Any]]:
+        """Get list of available tools based on current mode."""
+        cached = self._tools_cache.get(self.mode)
+        if cached is not None:
+            return cached
+
+        available_tools = []
+
+        for tool in self.tools.values():
+            if tool.requires_build_mode and self.mode is AgentMode.PLAN:
+                continue
+
+            available_tools.append(
+                {
+                    "type": "function",
+                    "function": {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "parameters": tool.parameters,
+                    },
+                }
+            )
+
+        self._tools_cache[self.mode] = available_tools
+        return available_tools
+
+    def _get_tools_hash(self) -> str:
+        """Get the cache-key hash of the current mode's tools."""
+        tools_hash = self._tools_hash_cache.get(self.mode)
+        if tools_hash is None:
+            tools_hash = hash_tools(self.get_available_tools())
+            self._tools_hash_cache[self.mode] = tools_hash
+        return tools_hash
+
+    def switch_mode(self, mode: AgentMode) -> None:
+        """Switch between Plan and Build modes."""
+        self.mode = mode
+
+    def _get_current_model(self) -> str:
+        """Get the configured model for the current mode."""
+        model = self._model_cache.get(self.mode)
+        if model is None:
+            model = get_config_manager().get_model_for_mode(self.mode.value)
+            self._model_cache[self.mode] = model
+        return model
+
+    def add_message(
+        self,
+        role: Literal["user", "assistant", "system", "tool"],
+        content: str,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        tool_call_id: Optional[str] = None,
+    ) -> None:
+        """Add a message to the conversation history."""
+        message = Message(
+            role=role, content=content, tool_calls=tool_calls, tool_call_id=tool_call_id
+        )
+        if self.store is not None:
+            self.store.append(role, content, tool_calls, tool_call_id)
+        self._append_message(message)
+
+    async def _aadd_message(
+        self,
+        role: Literal["user", "assistant", "system", "tool"],
+        content: str,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        tool_call_id: Optional[str] = None,
+    ) -> None:
+        """Add a message to the history, writing it to the store off the loop."""
+        message = Message(
+            role=role, content=content, tool_calls=tool_calls, tool_call_id=tool_call_id
+        )
+        if self.store is not None:
+            await asyncio.to_thread(
+                self.store.append, role, content, tool_calls, tool_call_id
+            )
+        self._append_message(message)
+
+    def _append_message(self, message: Message) -> None:
+        """Append a message to the in-memory history."""
+        self.messages.append(message)
+
+        api_message: Dict[str, Any] = {"role": message.role, "content": message.content}
+        if message.tool_calls:
+            api_message["tool_calls"] = message.tool_calls
+        if message.tool_call_id:
+            api_message["tool_call_id"] = message.tool_call_id
+        tokens = _estimate_message_tokens(api_message)
+        self._api_messages.append(api_message)
+        self._api_message_tokens.append(tokens)
+        self._api_tokens += tokens
+
+        if self.store is not None and len(self.messages) > RECENT_MESSAGES:
+            del self.messages[0]
+
+    def _truncate_to_budget(
+        self,
+        max_tokens: int = DEFAULT_CONTEXT_TOKENS,
+        max_turns: int = DEFAULT_CONTEXT_TURNS,
+    ) -> None:
+        """
+        Drop the oldest history until it fits the context window.
+
+        Args:
+            max_tokens: Token budget for the history
+            max_turns: Maximum number of user/assistant turns to keep
+        """
+        max_messages = 2 * max_turns
+        # Tool results are never sent without the assistant turn that requested them
+        while self._api_messages and (
+            self._api_messages[0]["role"] == "tool"
+            or (
+                len(self._api_messages) > 1
+                and (
+                    self._api_tokens > max_tokens
+                    or len(self._api_messages) > max_messages
+                )
+            )
+        ):
+            self._api_messages.popleft()
+            self._api_tokens -= self._api_message_tokens.popleft()
+
+    def _get_system_message(self) -> Dict[str, str]:
+        """Get the system message for the current mode."""
+        return _SYSTEM_MESSAGES[self.mode]
+
+    async def think(
+        self,
+        user_input: str,
+        selected_model: Any = None,
+        on_token: Optional[Callable[[str], Any]] = None,
+    ) -> str:
+        """
+        Process user input and generate a response (Think phase).
+
+        Args:
+            user_input: The user's message, empty to continue after tool calls
+            selected_model: Model chosen in the TUI, overrides the mode's model
+            on_token: Called with each content delta as it arrives; when set,
+                the completion is streamed
+
+        Returns:
+            The assistant's full reply
+        """
+        if _acompletion is None:
+            # Import litellm and load the token encoder without blocking the
+            # event loop, waiting on warmup() if it is already doing so
+            await asyncio.to_thread(_prepare_first_request)
+
+        # Add user message to history
+        await self._aadd_message("user", user_input)
+
+        # Prepare messages for AI, keeping the most recent history in budget
+        self._truncate_to_budget(
+            self.context_token_budget - _system_prompt_tokens(self.mode),
+            self.context_window_turns,
+        )
+        messages = [self._get_system_message(), *self._api_messages]
+
+        # Get available tools
+        tools = self.get_available_tools()
+
+        # Determine model to use
+        if selected_model:
+            model_name = selected_model.name
+            provider = selected_model.provider
+        else:
+            model_name = self._get_current_model()
+            provider = None
+
+        # Get API key for the provider if using TUI config
+        litellm_kwargs = get_config_manager().get_litellm_config()
+        if self.launch_config and provider:
+            api_key = self.launch_config.get_api_key_for_provider(provider)
+            if api_key:
+                litellm_kwargs["api_key"] = api_key
+
+        # Serve identical or near-duplicate requests from the response cache
+        cache_key: Optional[str] = None
+        cache_scope: Optional[str] = None
+        if self.response_cache is not None:
+            tools_hash = self._get_tools_hash()
+            cache_key = make_cache_key(
+                model_name,
+                self.mode.value,
+                messages,
+                tools,
+                self.config.temperature,
+                self.config.max_tokens,
+                tools_hash=tools_hash,
+            )
+            cached = self.response_cache.get(cache_key)
+            # Fuzzy hits only answer questions; a near-miss must never stand
+            # in for a BUILD-mode reply that drives tool execution
+            if cached is None and user_input and self.mode == AgentMode.PLAN:
+                # Same context minus the latest prompt
+                cache_scope = make_cache_key(
+                    model_name,
+                    self.mode.value,
+                    messages[:-1],
+                    tools,
+                    self.config.temperature,
+                    self.config.max_tokens,
+                    tools_hash=tools_hash,
+                )
+                cached = self.response_cache.find_similar(cache_scope, user_input)
+            if cached is not None:
+                self.usage_stats["cache_hits"] += 1
+                self.usage_stats["saved_tokens"] += cached.total_tokens
+                await self._aadd_message("assistant", cached.content)
+                if on_token is not None:
+                    on_token(cached.content)
+                return cached.content
+
+        try:
+            # Call AI model
+            request = dict(
+                model=model_name,
+                messages=messages,
+                tools=tools if tools else None,
+                tool_choice="auto" if tools else None,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                **litellm_kwargs,
+            )
+            acompletion = _get_acompletion()
+            if _accepts_shared_session(acompletion):
+                # Per request, so other litellm users in the process are unaffected
+                request["shared_session"] = await self._get_http_client()
+            if on_token is None:
+                response = await acompletion(**request)
+            else:
+                response = await self._stream_completion(request, on_token)
+
+            # Extract response content
+            assistant_message = response.choices[0].message
+
+            # Track usage statistics
+            await self._track_usage(response)
+
+            # Tool calls have side effects, so only plain replies are cached
+            if (
+                self.response_cache is not None
+                and cache_key is not None
+                and not assistant_message.tool_calls
+            ):
+                usage = getattr(response, "usage", None)
+                self.response_cache.set(
+                    cache_key,
+                    CachedResponse(
+                        content=assistant_message.content or "",
+                        total_tokens=getattr(usage, "total_tokens", 0) or 0,
+                    ),
+                    scope=cache_scope,
+                    prompt=user_input if cache_scope is not None else None,
+                )
+
+            # Add assistant response to history
+            await self._aadd_message(
+                "assistant",
+                assistant_message.content or "",
+                assistant_message.tool_calls,
+            )
+
+            return assistant_message.content or ""
+
+        except Exception as e:
+            error_msg = f"AI Error: {str(e)}"
+            await self._aadd_message("assistant", error_msg)
+            return error_msg
+
+    async def warmup(self, model: Optional[str] = None) -> None:
+        """
+        Do one-off setup work ahead of the first request.
+
+        Imports litellm, loads the model's pricing and starts loading the
+        token encoder in a background thread, so the first think() does not
+        pay for them.
+
+        Args:
+            model: Model the first request will use, defaults to the mode's model
+        """
+        model_name = model or self._get_current_model()
+
+        def warm() -> None:
+            _prepare_first_request()
+            _get_cost_rates(model_name)
+
+        await asyncio.to_thread(warm)
+
+    async def _get_http_client(self) -> Any:
+        """Get the pooled HTTP client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._http_client_loop is not loop:
+            # A client cannot outlive its event loop, so each loop gets its own
+            await self.aclose()
+        if self._http_client is None:
+            self._http_client = _create_http_client()
+            self._http_client_loop = loop
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        client, loop = self._http_client, self._http_client_loop
+        self._http_client = None
+        self._http_client_loop = None
+        if client is None or loop is None:
+            return
+
+        try:
+            if loop is asyncio.get_running_loop():
+                await client.close()
+            elif loop.is_running():
+                # Still serving another thread; close it there
+                future = asyncio.run_coroutine_threadsafe(client.close(), loop)
+                await asyncio.wrap_future(future)
+            else:
+                # The loop has stopped, so nothing can await the close;
+                # drop its sockets directly
+                connector = client.connector
+                client.detach()
+                if connector is not None:
+                    try:
+                        closing = connector.close(abort_ssl=True)
+                    except TypeError:
+                        # abort_ssl only exists in recent aiohttp releases
+                        closing = connector.close()
+                    if inspect.isawaitable(closing):
+                        await closing
+        except Exception:
+            logger.debug("Failed to close the pooled HTTP client", exc_info=True)
+
+    async def _stream_completion(
+        self, request: Dict[str, Any], on_token: Callable[[str], Any]
+    ) -> Any:
+        """
+        Stream a completion, passing content deltas to on_token as they arrive.
+
+        Args:
+            request: Keyword arguments for acompletion
+            on_token: Called with each non-empty content delta
+
+        Returns:
+            The full response rebuilt from the streamed chunks
+        """
+        chunks = []
+        usage = None
+        # Ask for the provider's own token counts in a final usage chunk
+        stream = await _get_acompletion()(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            chunks.append(chunk)
+            usage = getattr(chunk, "usage", None) or usage
+            if chunk.choices:
+                content = chunk.choices[0].delta.content
+                if content:
+                    on_token(content)
+
+        # Rebuild a regular response so usage, caching and tool calls are
+        # handled exactly as in the non-streaming path. The builder may
+        # re-tokenize the whole history, so it runs off the event loop
+        response = await asyncio.to_thread(
+            _get_stream_chunk_builder(), chunks, messages=request["messages"]
+        )
+        if usage is not None:
+            # Reported counts beat the builder's re-tokenized estimate
+            response.usage = usage
+        return response
+
+    async def act(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute tool calls (Act phase).
+
+        Calls run in the model's order. Consecutive parallel-safe calls run
+        concurrently; any other call runs alone, once the calls before it
+        finish. Results are recorded in the original call order.
+
+        Args:
+            tool_calls: Tool calls requested by the model
+
+        Returns:
+            List of tool results in call order
+        """
+        calls = []
+        outcomes: List[Any] = []
+        for tool_call in tool_calls:
+            # Malformed arguments fail only their own call, not the batch
+            try:
+                # Some providers send "" for tools called without arguments
+                tool_args = _json_loads(tool_call["function"]["arguments"] or "{}")
+                outcome = None
+            except ValueError as e:
+                tool_args, outcome = {}, e
+            calls.append(
+                (
+                    tool_call.get("id", "unknown"),
+                    tool_call["function"]["name"],
+                    tool_args,
+                )
+            )
+            outcomes.append(outcome)
+
+        pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        for parallel_safe, group in itertools.groupby(
+            pending, key=lambda i: self._is_parallel_safe(calls[i][1])
+        ):
+            batch = list(group)
+            if parallel_safe:
+                gathered = await asyncio.gather(
+                    *(self._run_tool(calls[i][1], calls[i][2]) for i in batch),
+                    return_exceptions=True,
+                )
+                for i, outcome in zip(batch, gathered):
+                    outcomes[i] = outcome
+                continue
+
+            for i in batch:
+                try:
+                    outcomes[i] = await self._run_tool(calls[i][1], calls[i][2])
+                except Exception as e:
+                    outcomes[i] = e
+
+        results = []
+        for (tool_call_id, _, _), outcome in zip(calls, outcomes):
+            if isinstance(outcome, Exception):
+                result = f"Tool Error: {str(outcome)}"
+            else:
+                result = str(outcome)
+
+            # Add tool result message
+            await self._aadd_message("tool", result, tool_call_id=tool_call_id)
+
+            results.append({"tool_call_id": tool_call_id, "result": result})
+
+        return results
+
+    def _is_parallel_safe(self, tool_name: str) -> bool:
+        """Whether a tool may run concurrently with other tool calls."""
+        # Unknown tools only produce an error, so there is nothing to overlap
+        tool = self.tools.get(tool_name)
+        return tool is not None and tool.parallel_safe
+
+    async def _run_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Any:
+        """Execute a single registered tool."""
+        tool = self.tools[tool_name]
+        return await tool.function(**tool_args)
+
+    async def process(
+        self,
+        user_input: str,
+        selected_model: Any = None,
+        on_token: Optional[Callable[[str], Any]] = None,
+    ) -> str:
+        """Main Think-Act loop processing."""
+        # Think phase
+        response = await self.think(
+            user_input, selected_model=selected_model, on_token=on_token
+        )
+
+        # Check if there are tool calls to execute
+        last_message = self.messages[-1] if self.messages else None
+        if last_message and last_message.tool_calls:
+            # Act phase
+            await self.act(last_message.tool_calls)
+
+            # Think again with tool results
+            response = await self.think(
+                "", selected_model=selected_model, on_token=on_token
+            )  # Empty input to continue conversation
+
+        return response
+
+    def _get_system_prompt(self) -> str:
+        """Get system prompt based on current mode."""
+        return _SYSTEM_PROMPTS[self.mode]
+
     def clear_history(self) -> None:
         """Clear conversation history."""
         self.messages = []
+        self._api_messages.clear()
+        self._api_message_tokens.clear()
+        self._api_tokens = 0
+        if self.store is not None:
+            self.store.clear_messages()
 
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get summary of current conversation."""
@@ -459,26 +998,34 @@ EFFICIENCY TIPS:
             "mode": self.mode.value,
             "message_count": len(self.messages),
             "available_tools": len(self.get_available_tools()),
-            "current_model": config_manager.get_model_for_mode(self.mode.value),
+            "current_model": self._get_current_model(),
             "auth_mode": (
-                "subscription" if config_manager.is_subscription_mode() else "byok"
+                "subscription"
+                if get_config_manager().is_subscription_mode()
+                else "byok"
             ),
             "usage_stats": self.usage_stats,
         }
 
-    def get_usage_stats(self) -> Dict[str, Any]:
-        """Get current usage statistics."""
-        return self.usage_stats.copy()
+    def get_usage_stats(self) -> Mapping[str, Any]:
+        """Get a live, read-only view of the usage statistics."""
+        return self._usage_view
 
     def reset_usage_stats(self) -> None:
         """Reset usage statistics."""
-        self.usage_stats = {
-            "total_tokens": 0,
-            "total_cost": 0.0,
-            "requests_count": 0,
-            "current_context_tokens": 0,
-        }
+        self.usage_stats.update(_EMPTY_USAGE)
+        if self.store is not None:
+            self.store.save_usage(self.usage_stats)
+
+
+@functools.lru_cache(maxsize=1)
+def get_agent_core() -> AgentCore:
+    """Get the shared agent instance, creating it on first use."""
+    return AgentCore()
 
 
-# Global agent instance
-agent_core = AgentCore()
+def __getattr__(name: str) -> Any:
+    # Deprecated: agent_core used to be created eagerly at import time
+    if name == "agent_core":
+        return get_agent_core()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
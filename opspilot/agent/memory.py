@@ -5,18 +5,52 @@ Handles chat history persistence, conversation context management,
 and session state for the agent.
 """
 
+import asyncio
+import atexit
+import functools
 import json
+import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, BinaryIO, Callable, Iterator, Union
+from dataclasses import dataclass, field
 from datetime import datetime
 import uuid
 
-from ..config import config_manager
+from ..config import get_config_manager
+from .tokens import estimate_tokens
 
+try:
+    import orjson
 
-@dataclass
+    def _dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    _loads: Callable[[Union[bytes, str]], Any] = orjson.loads
+except ImportError:
+
+    def _dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to JSON bytes."""
+        return json.dumps(obj, indent=2 if indent else None).encode()
+
+    _loads = json.loads
+
+# Sidecar file holding the summary of every session, so listing sessions
+# doesn't have to open and parse each session file
+INDEX_FILE = "_index.json"
+
+# ChatMessage interns its role, so roles can be compared by identity
+_ROLE_SYSTEM = sys.intern("system")
+_ROLE_TOOL = sys.intern("tool")
+
+# Messages appended to a session's log before it is compacted into a snapshot
+SNAPSHOT_INTERVAL = 50
+
+
+@dataclass(slots=True)
 class ChatMessage:
     """Represents a single chat message."""
 
@@ -27,10 +61,24 @@ class ChatMessage:
     tool_calls: Optional[List[Dict[str, Any]]] = None
     tool_call_id: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    # Cached token estimate; derived, so never serialized
+    _tokens: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.role = sys.intern(self.role)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
-        return asdict(self)
+        # Built by hand; dataclasses.asdict deep-copies every nested value
+        return {
+            "id": self.id,
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "tool_calls": self.tool_calls,
+            "tool_call_id": self.tool_call_id,
+            "metadata": self.metadata,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ChatMessage":
@@ -38,7 +86,7 @@ class ChatMessage:
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationSession:
     """Represents a conversation session."""
 
@@ -90,6 +138,14 @@ class MemoryManager:
             self.storage_dir = Path.home() / ".opspilot" / "conversations"
 
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.storage_dir / INDEX_FILE
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        # Set when the in-memory index has changes not yet written to disk
+        self._index_dirty = False
+        # Append-only message log of the session being written to
+        self._log_file: Optional[BinaryIO] = None
+        self._log_session_id: Optional[str] = None
+        self._log_count = 0
         self.current_session: Optional[ConversationSession] = None
         self.max_messages_per_session = 1000
         self.max_sessions = 50
@@ -115,9 +171,11 @@ class MemoryManager:
             messages=[],
             metadata={
                 "mode": "plan",
-                "model": config_manager.get_model_for_mode("plan"),
+                "model": get_config_manager().get_model_for_mode("plan"),
                 "auth_mode": (
-                    "subscription" if config_manager.is_subscription_mode() else "byok"
+                    "subscription"
+                    if get_config_manager().is_subscription_mode()
+                    else "byok"
                 ),
             },
         )
@@ -143,9 +201,16 @@ class MemoryManager:
             return False
 
         try:
-            with open(session_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
+            with open(session_file, "rb") as f:
+                data = _loads(f.read())
+
+            logged = _read_message_log(self._log_path(session_id))
+            if logged:
+                data["messages"].extend(logged)
+                data["updated_at"] = logged[-1]["timestamp"]
+            if self._log_session_id not in (None, session_id):
+                # Switching sessions releases the old log and flushes the index
+                self._close_log()
             self.current_session = ConversationSession.from_dict(data)
             return True
 
@@ -165,8 +230,16 @@ class MemoryManager:
         session_file = self.storage_dir / f"{session_id}.json"
 
         try:
+            if self._log_session_id == session_id:
+                self._close_log()
+
             if session_file.exists():
                 session_file.unlink()
+            self._log_path(session_id).unlink(missing_ok=True)
+
+            index = self._get_index()
+            if index.pop(session_id, None) is not None:
+                self._write_index()
 
             if self.current_session and self.current_session.id == session_id:
                 self.current_session = None
@@ -210,8 +283,10 @@ class MemoryManager:
             timestamp=now,
             tool_calls=tool_calls,
             tool_call_id=tool_call_id,
-            metadata=metadata or {},
+            metadata=dict(metadata) if metadata else {},
         )
+        # Counted once here so context assembly never re-encodes history
+        _message_tokens(message)
 
         if self.current_session:
             self.current_session.messages.append(message)
@@ -219,19 +294,74 @@ class MemoryManager:
 
             # Trim messages if too many
             if len(self.current_session.messages) > self.max_messages_per_session:
-                # Keep system messages and recent messages
-                system_messages = [
-                    msg for msg in self.current_session.messages if msg.role == "system"
-                ]
-                recent_messages = self.current_session.messages[
-                    -(self.max_messages_per_session - len(system_messages)) :
-                ]
-                self.current_session.messages = system_messages + recent_messages
-
-            self._save_session(self.current_session)
+                self._trim_messages(self.current_session)
+                # Trimming rewrites history, which needs a full snapshot
+                self._save_session(self.current_session)
+            else:
+                self._append_to_log(self.current_session, message)
 
         return message_id
 
+    def _trim_messages(self, session: ConversationSession) -> None:
+        """Drop the oldest non-system messages beyond the per-session limit."""
+        messages = session.messages
+        excess = len(messages) - self.max_messages_per_session
+        # Deleting in place avoids rebuilding the list; usually only the
+        # single oldest message goes, so the scan stops early
+        i = 0
+        while excess > 0 and i < len(messages):
+            if messages[i].role is _ROLE_SYSTEM:
+                i += 1
+            else:
+                del messages[i]
+                excess -= 1
+
+    async def aadd_message(
+        self,
+        role: str,
+        content: str,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        tool_call_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Add a message to the current session without blocking the event loop.
+
+        Args:
+            role: Message role ("user", "assistant", "system", "tool")
+            content: Message content
+            tool_calls: Tool calls made by the assistant
+            tool_call_id: Tool call ID for tool responses
+            metadata: Additional metadata
+
+        Returns:
+            Message ID
+        """
+        return await asyncio.to_thread(
+            self.add_message, role, content, tool_calls, tool_call_id, metadata
+        )
+
+    async def aload_session(self, session_id: str) -> bool:
+        """
+        Load an existing session without blocking the event loop.
+
+        Args:
+            session_id: ID of session to load
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await asyncio.to_thread(self.load_session, session_id)
+
+    async def alist_sessions(self) -> List[Dict[str, Any]]:
+        """
+        List all available sessions without blocking the event loop.
+
+        Returns:
+            List of session summaries
+        """
+        return await asyncio.to_thread(self.list_sessions)
+
     def get_messages(
         self, limit: Optional[int] = None, include_system: bool = True
     ) -> List[ChatMessage]:
@@ -251,7 +381,7 @@ class MemoryManager:
         messages = self.current_session.messages
 
         if not include_system:
-            messages = [msg for msg in messages if msg.role != "system"]
+            messages = [msg for msg in messages if msg.role is not _ROLE_SYSTEM]
 
         if limit:
             messages = messages[-limit:]
@@ -273,19 +403,31 @@ class MemoryManager:
         """
         messages = self.get_messages(include_system=include_system)
 
+        # System messages are always kept; the rest is filled from the most
+        # recent message backwards until the budget runs out
+        system_messages = [msg for msg in messages if msg.role is _ROLE_SYSTEM]
+        budget = max_tokens - sum(_message_tokens(msg) for msg in system_messages)
+        recent_messages: List[ChatMessage] = []
+        for msg in reversed(messages):
+            if msg.role is _ROLE_SYSTEM:
+                continue
+            budget -= _message_tokens(msg)
+            if budget < 0:
+                break
+            recent_messages.append(msg)
+        recent_messages.reverse()
+
+        # Tool results are never sent without the assistant turn that
+        # requested them
+        start = 0
+        while (
+            start < len(recent_messages) and recent_messages[start].role is _ROLE_TOOL
+        ):
+            start += 1
+        del recent_messages[:start]
+
         # Convert to OpenAI format
-        context = []
-        for msg in messages:
-            context.append(
-                {
-                    "role": msg.role,
-                    "content": msg.content,
-                    "tool_calls": msg.tool_calls,
-                    "tool_call_id": msg.tool_call_id,
-                }
-            )
-
-        return context
+        return [_to_api_message(msg) for msg in system_messages + recent_messages]
 
     def update_session_metadata(self, metadata: Dict[str, Any]) -> None:
         """
@@ -308,26 +450,7 @@ class MemoryManager:
         Returns:
             List of session summaries
         """
-        sessions = []
-
-        for session_file in self.storage_dir.glob("*.json"):
-            try:
-                with open(session_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                sessions.append(
-                    {
-                        "id": data["id"],
-                        "title": data["title"],
-                        "created_at": data["created_at"],
-                        "updated_at": data["updated_at"],
-                        "message_count": len(data["messages"]),
-                        "metadata": data.get("metadata", {}),
-                    }
-                )
-
-            except Exception:
-                continue
+        sessions = [dict(summary) for summary in self._get_index().values()]
 
         # Sort by updated_at (most recent first)
         sessions.sort(key=lambda x: x["updated_at"], reverse=True)
@@ -367,72 +490,175 @@ class MemoryManager:
         Returns:
             Exported content or None if failed
         """
-        if not self.load_session(session_id):
-            return None
-
-        if not self.current_session:
+        if not self.load_session(session_id) or not self.current_session:
             return None
 
         if format == "json":
-            return json.dumps(self.current_session.to_dict(), indent=2)
-
-        elif format == "markdown":
-            lines = [
-                f"# {self.current_session.title}",
-                f"*Created: {datetime.fromtimestamp(self.current_session.created_at)}*",
-                f"*Updated: {datetime.fromtimestamp(self.current_session.updated_at)}*",
-                "",
-                "---",
-                "",
-            ]
-
-            for msg in self.current_session.messages:
-                if msg.role == "system":
-                    continue
-
-                role_emoji = {"user": "👤", "assistant": "🤖", "tool": "🔧"}.get(
-                    msg.role, "•"
-                )
-                timestamp = datetime.fromtimestamp(msg.timestamp).strftime("%H:%M:%S")
-
-                lines.append(f"## {role_emoji} {msg.role.title()} ({timestamp})")
-                lines.append("")
-                lines.append(msg.content)
-                lines.append("")
-
-            return "\n".join(lines)
+            return _dumps(self.current_session.to_dict(), indent=True).decode()
 
-        elif format == "txt":
-            lines = [f"Conversation: {self.current_session.title}"]
-            lines.append("=" * 50)
-            lines.append("")
+        lines = self._iter_export_lines(self.current_session, format)
+        if lines is None:
+            return None
+        return "\n".join(lines)
 
-            for msg in self.current_session.messages:
-                if msg.role == "system":
-                    continue
+    def export_session_to(
+        self, session_id: str, path: Union[str, Path], format: str = "json"
+    ) -> bool:
+        """
+        Export session to a file, writing it as it is rendered.
+
+        Args:
+            session_id: ID of session to export
+            path: File to write the export to
+            format: Export format ("json", "markdown", "txt")
 
-                timestamp = datetime.fromtimestamp(msg.timestamp).strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                )
-                lines.append(f"[{timestamp}] {msg.role.upper()}:")
-                lines.append(msg.content)
-                lines.append("")
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.load_session(session_id) or not self.current_session:
+            return False
 
-            return "\n".join(lines)
+        if format == "json":
+            with open(path, "wb") as f:
+                f.write(_dumps(self.current_session.to_dict(), indent=True))
+            return True
 
+        lines = self._iter_export_lines(self.current_session, format)
+        if lines is None:
+            return False
+        with open(path, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line)
+                f.write("\n")
+        return True
+
+    def _iter_export_lines(
+        self, session: ConversationSession, format: str
+    ) -> Optional[Iterator[str]]:
+        """Get the lines of a text export, or None for unknown formats."""
+        if format == "markdown":
+            return _iter_export_markdown(session)
+        elif format == "txt":
+            return _iter_export_txt(session)
         return None
 
     def _save_session(self, session: ConversationSession) -> None:
-        """Save session to file."""
+        """Save a full snapshot of the session and truncate its message log."""
         session_file = self.storage_dir / f"{session.id}.json"
 
-        with open(session_file, "w", encoding="utf-8") as f:
-            json.dump(session.to_dict(), f, indent=2)
+        with open(session_file, "wb") as f:
+            f.write(_dumps(session.to_dict(), indent=True))
+
+        # Closing the log flushes the index along with any other changes
+        self._update_index(session, write=False)
+        if self._log_session_id == session.id:
+            self._close_log()
+        self._log_path(session.id).unlink(missing_ok=True)
+        if self._index_dirty:
+            self._write_index()
+
+    def _append_to_log(
+        self, session: ConversationSession, message: ChatMessage
+    ) -> None:
+        """Append a message to the session's log, compacting it periodically."""
+        if self._log_session_id != session.id:
+            self._close_log()
+            log_path = self._log_path(session.id)
+            # A resumed session may already have messages logged since its
+            # last snapshot, and they count towards the next compaction
+            self._log_count = _repair_log(log_path)
+            # Unbuffered, so every message reaches the file as it is written
+            self._log_file = open(log_path, "ab", buffering=0)
+            self._log_session_id = session.id
+
+        assert self._log_file is not None
+        self._log_file.write(_dumps(message.to_dict()) + b"\n")
+        self._log_count += 1
+
+        if self._log_count >= SNAPSHOT_INTERVAL:
+            self._save_session(session)
+        else:
+            # Written to disk with the next snapshot, session switch or close
+            self._update_index(session, write=False)
+
+    def _close_log(self) -> None:
+        """Close the open message log, if any, and flush the index."""
+        if self._index_dirty:
+            self._write_index()
+        if self._log_file is not None:
+            self._log_file.close()
+        self._log_file = None
+        self._log_session_id = None
+        self._log_count = 0
+
+    def _log_path(self, session_id: str) -> Path:
+        """Get the path of a session's append-only message log."""
+        return self.storage_dir / f"{session_id}.jsonl"
+
+    def close(self) -> None:
+        """Compact the current session and release the message log."""
+        if self.current_session and self._log_session_id == self.current_session.id:
+            self._save_session(self.current_session)
+        self._close_log()
+
+    def _update_index(self, session: ConversationSession, write: bool = True) -> None:
+        """
+        Update the session's summary in the index.
+
+        Args:
+            session: Session to summarize
+            write: Write the index to disk now rather than on the next flush
+        """
+        self._get_index()[session.id] = {
+            "id": session.id,
+            "title": session.title,
+            "created_at": session.created_at,
+            "updated_at": session.updated_at,
+            "message_count": len(session.messages),
+            "metadata": session.metadata,
+        }
+        if write:
+            self._write_index()
+        else:
+            self._index_dirty = True
+
+    def _session_files(self) -> List[Path]:
+        """Get all session files in the storage directory."""
+        return [
+            path for path in self.storage_dir.glob("*.json") if path.name != INDEX_FILE
+        ]
+
+    def _get_index(self) -> Dict[str, Dict[str, Any]]:
+        """Get the session index, loading or rebuilding it on first use."""
+        if self._index is None:
+            try:
+                with open(self._index_path, "rb") as f:
+                    self._index = _loads(f.read())
+            except (OSError, ValueError):
+                self._index = self._rebuild_index()
+                self._write_index()
+        return self._index  # type: ignore[return-value]
+
+    def _rebuild_index(self) -> Dict[str, Dict[str, Any]]:
+        """Build the session index by reading every session file."""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            summaries = executor.map(_read_session_summary, self._session_files())
+        return {summary["id"]: summary for summary in summaries if summary}
+
+    def _write_index(self) -> None:
+        """Atomically write the session index to disk."""
+        tmp_path = self._index_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_dumps(self._index))
+        os.replace(tmp_path, self._index_path)
+        self._index_dirty = False
 
     def reset_database(self) -> None:
         """Delete all session files."""
-        for session_file in self.storage_dir.glob("*.json"):
+        self._close_log()
+        for session_file in self.storage_dir.glob("*.json*"):
             session_file.unlink()
+        self._index = {}
         self.current_session = None
 
     def get_session_stats(self) -> Dict[str, Any]:
@@ -442,8 +668,9 @@ class MemoryManager:
         total_messages = sum(s["message_count"] for s in sessions)
         total_size = 0
 
-        for session_file in self.storage_dir.glob("*.json"):
-            total_size += session_file.stat().st_size
+        for session_file in self.storage_dir.glob("*.json*"):
+            if session_file.name != INDEX_FILE:
+                total_size += session_file.stat().st_size
 
         return {
             "total_sessions": len(sessions),
@@ -456,5 +683,136 @@ class MemoryManager:
         }
 
 
-# Global memory manager instance
-memory_manager = MemoryManager()
+def _to_api_message(message: ChatMessage) -> Dict[str, Any]:
+    """Convert a message to OpenAI format, omitting unset tool fields."""
+    api_message: Dict[str, Any] = {"role": message.role, "content": message.content}
+    if message.tool_calls:
+        api_message["tool_calls"] = message.tool_calls
+    if message.tool_call_id:
+        api_message["tool_call_id"] = message.tool_call_id
+    return api_message
+
+
+def _message_tokens(message: ChatMessage) -> int:
+    """Get a message's token estimate, caching it on the message."""
+    tokens = message._tokens
+    if tokens is None:
+        tokens = estimate_tokens(message.content)
+        if message.tool_calls:
+            tokens += estimate_tokens(_dumps(message.tool_calls).decode())
+        message._tokens = tokens
+    return tokens
+
+
+def _iter_export_markdown(session: ConversationSession) -> Iterator[str]:
+    """Render a session as Markdown, one line at a time."""
+    yield f"# {session.title}"
+    yield f"*Created: {datetime.fromtimestamp(session.created_at)}*"
+    yield f"*Updated: {datetime.fromtimestamp(session.updated_at)}*"
+    yield ""
+    yield "---"
+    yield ""
+
+    for msg in session.messages:
+        if msg.role is _ROLE_SYSTEM:
+            continue
+
+        role_emoji = {"user": "👤", "assistant": "🤖", "tool": "🔧"}.get(msg.role, "•")
+        timestamp = datetime.fromtimestamp(msg.timestamp).strftime("%H:%M:%S")
+
+        yield f"## {role_emoji} {msg.role.title()} ({timestamp})"
+        yield ""
+        yield msg.content
+        yield ""
+
+
+def _iter_export_txt(session: ConversationSession) -> Iterator[str]:
+    """Render a session as plain text, one line at a time."""
+    yield f"Conversation: {session.title}"
+    yield "=" * 50
+    yield ""
+
+    for msg in session.messages:
+        if msg.role is _ROLE_SYSTEM:
+            continue
+
+        timestamp = datetime.fromtimestamp(msg.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        yield f"[{timestamp}] {msg.role.upper()}:"
+        yield msg.content
+        yield ""
+
+
+def _read_session_summary(session_file: Path) -> Optional[Dict[str, Any]]:
+    """Read the index summary of a session file, or None if unreadable."""
+    try:
+        with open(session_file, "rb") as f:
+            data = _loads(f.read())
+
+        logged = _read_message_log(session_file.with_suffix(".jsonl"))
+        return {
+            "id": data["id"],
+            "title": data["title"],
+            "created_at": data["created_at"],
+            "updated_at": logged[-1]["timestamp"] if logged else data["updated_at"],
+            "message_count": len(data["messages"]) + len(logged),
+            "metadata": data.get("metadata", {}),
+        }
+
+    except Exception:
+        return None
+
+
+def _repair_log(log_file: Path) -> int:
+    """Cut a message log back to its last valid line and count its messages."""
+    # A crash can leave a partially written last line; appending after it
+    # would merge the next message into it and hide everything logged later
+    try:
+        f = open(log_file, "r+b")
+    except FileNotFoundError:
+        return 0
+
+    with f:
+        count = end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                _loads(line)
+            except ValueError:
+                break
+            count += 1
+            end += len(line)
+        f.truncate(end)
+    return count
+
+
+def _read_message_log(log_file: Path) -> List[Dict[str, Any]]:
+    """Read messages appended to a session log since its last snapshot."""
+    if not log_file.exists():
+        return []
+
+    messages = []
+    with open(log_file, "rb") as f:
+        for line in f:
+            try:
+                messages.append(_loads(line))
+            except ValueError:
+                # A partially written last line is dropped
+                break
+    return messages
+
+
+@functools.lru_cache(maxsize=1)
+def get_memory_manager() -> MemoryManager:
+    """Get the shared memory manager, creating it on first use."""
+    manager = MemoryManager()
+    # Compact the open message log into a snapshot when the process exits
+    atexit.register(manager.close)
+    return manager
+
+
+def __getattr__(name: str) -> Any:
+    # Deprecated: memory_manager used to be created eagerly at import time
+    if name == "memory_manager":
+        return get_memory_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,236 @@
+"""
+OpsPilot Response Cache
+
+In-process LRU cache for LLM responses, keyed on a hash of the
+canonicalized request so identical prompts skip the network round-trip.
+Near-duplicate prompts in the same context are matched by the similarity
+of their ordered token sequences.
+"""
+
+import difflib
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Words for fuzzy matching; keeps the characters of hosts, paths and IPs
+_TOKEN_RE = re.compile(r"[\w./:\-]*\w")
+
+# Minimum token similarity for two prompts to share a cached response
+SIMILARITY_THRESHOLD = 0.85
+
+
+def _canonicalize_text(text: str) -> str:
+    """Normalize case and whitespace so trivially different prompts share a key.
+
+    Punctuation is kept: "ping 10.0.0.1" and "ping 100.0.1" are different
+    requests.
+    """
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def _canonicalize(messages: List[Dict[str, Any]]) -> str:
+    """Canonicalize a message history into a single string."""
+    return "\n".join(
+        f"{msg['role']}:{_canonicalize_text(msg.get('content') or '')}"
+        for msg in messages
+    )
+
+
+def _dumps_sorted(obj: Any) -> bytes:
+    """Serialize to JSON bytes with sorted keys."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS, default=str)
+    return json.dumps(obj, sort_keys=True, default=str).encode()
+
+
+def hash_tools(tools: Optional[List[Dict[str, Any]]]) -> str:
+    """Hash a list of tool definitions for use in cache keys."""
+    return hashlib.sha256(_dumps_sorted(tools or [])).hexdigest()
+
+
+def make_cache_key(
+    model: str,
+    mode: str,
+    messages: List[Dict[str, Any]],
+    tools: Optional[List[Dict[str, Any]]],
+    temperature: float,
+    max_tokens: int,
+    tools_hash: Optional[str] = None,
+) -> str:
+    """
+    Build a cache key for an LLM request.
+
+    Args:
+        model: Model name
+        mode: Agent mode value ("plan" or "build")
+        messages: Messages in OpenAI format
+        tools: Tool definitions sent with the request
+        temperature: Sampling temperature
+        max_tokens: Maximum completion tokens
+        tools_hash: Precomputed hash_tools(tools), saves rehashing the tools
+
+    Returns:
+        SHA-256 hex digest identifying the request
+    """
+    if tools_hash is None:
+        tools_hash = hash_tools(tools)
+    canon = _canonicalize(messages)
+    key_data = f"{model}:{mode}:{temperature}:{max_tokens}:{canon}:{tools_hash}"
+    return hashlib.sha256(key_data.encode()).hexdigest()
+
+
+def tokenize_prompt(prompt: str) -> Tuple[str, ...]:
+    """Split a prompt into its sequence of canonical tokens."""
+    return tuple(_TOKEN_RE.findall(prompt.lower()))
+
+
+def token_similarity(a: Tuple[str, ...], b: Tuple[str, ...]) -> float:
+    """Similarity of two token sequences, sensitive to word order.
+
+    "copy prod to staging" and "copy staging to prod" are not similar.
+    Empty sequences are never similar to anything.
+    """
+    if not a or not b:
+        return 0.0
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+@dataclass
+class CachedResponse:
+    """An assistant reply stored in the cache."""
+
+    content: str
+    total_tokens: int = 0
+
+
+@dataclass
+class CacheEntry:
+    """A cached response with its insertion time."""
+
+    response: CachedResponse
+    created_at: float
+    scope: Optional[str] = None
+    tokens: Tuple[str, ...] = ()
+
+
+class ResponseCache:
+    """LRU cache of LLM responses with a time-to-live."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 24 * 60 * 60,
+        similarity_threshold: float = SIMILARITY_THRESHOLD,
+    ) -> None:
+        """
+        Initialize response cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl: Seconds before an entry expires
+            similarity_threshold: Minimum token similarity for a fuzzy hit
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Cached response, or None on miss or expiry
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if time.time() - entry.created_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def find_similar(self, scope: str, prompt: str) -> Optional[CachedResponse]:
+        """
+        Find a cached response for a near-duplicate prompt.
+
+        Args:
+            scope: Key of the request context the prompt was sent in
+            prompt: The latest user prompt
+
+        Returns:
+            Most recently used response whose prompt is similar enough, or None
+        """
+        tokens = tokenize_prompt(prompt)
+        size = len(tokens)
+        if not size:
+            # Nothing left to compare, e.g. a prompt of only punctuation
+            return None
+        now = time.time()
+
+        for key in reversed(self._entries):
+            entry = self._entries[key]
+            if entry.scope != scope or now - entry.created_at > self.ttl:
+                continue
+
+            # The similarity is at most 2 * min / (sum) of the lengths, so
+            # entries of very different length are skipped without matching
+            other = len(entry.tokens)
+            if 2 * min(size, other) < self.similarity_threshold * (size + other):
+                continue
+
+            if token_similarity(tokens, entry.tokens) >= self.similarity_threshold:
+                self._entries.move_to_end(key)
+                return entry.response
+
+        return None
+
+    def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        scope: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> None:
+        """
+        Store a response, evicting the least recently used entries.
+
+        Args:
+            key: Cache key from make_cache_key
+            response: Response to cache
+            scope: Key of the request context, enables find_similar lookups
+            prompt: The latest user prompt, enables find_similar lookups
+        """
+        self._entries[key] = CacheEntry(
+            response=response,
+            created_at=time.time(),
+            scope=scope,
+            tokens=tokenize_prompt(prompt) if prompt is not None else (),
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,154 @@
+"""
+OpsPilot Conversation Store
+
+SQLite-backed persistence for the agent's message history and usage
+statistics, so long sessions keep only a recent window in memory and can
+be resumed after a restart.
+"""
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    tool_calls JSON,
+    tool_call_id TEXT
+);
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value JSON NOT NULL
+);
+"""
+
+# Statements are kept as constants so sqlite3's statement cache reuses them
+_INSERT_MESSAGE = (
+    "INSERT INTO messages (ts, role, content, tool_calls, tool_call_id) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_SELECT_RECENT = (
+    "SELECT role, content, tool_calls, tool_call_id FROM messages "
+    "ORDER BY id DESC LIMIT ?"
+)
+_UPSERT_KV = "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)"
+_SELECT_KV = "SELECT value FROM kv WHERE key = ?"
+
+_USAGE_KEY = "usage_stats"
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize provider objects such as litellm tool calls."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+class ConversationStore:
+    """Persists agent messages and usage statistics in SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize conversation store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        if db_path:
+            self.db_path = Path(db_path)
+        else:
+            self.db_path = Path.home() / ".opspilot" / "agent.db"
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # TUI workers call the agent from their own threads
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(
+        self,
+        role: str,
+        content: str,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        tool_call_id: Optional[str] = None,
+    ) -> None:
+        """
+        Append a message to the history.
+
+        Args:
+            role: Message role
+            content: Message content
+            tool_calls: Tool calls requested by the assistant
+            tool_call_id: ID of the tool call this message answers
+        """
+        with self._conn:
+            self._conn.execute(
+                _INSERT_MESSAGE,
+                (
+                    time.time(),
+                    role,
+                    content,
+                    (
+                        json.dumps(tool_calls, default=_json_default)
+                        if tool_calls
+                        else None
+                    ),
+                    tool_call_id,
+                ),
+            )
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Get the most recent messages.
+
+        Args:
+            limit: Maximum number of messages to return
+
+        Returns:
+            Messages in chronological order
+        """
+        rows = self._conn.execute(_SELECT_RECENT, (limit,)).fetchall()
+        return [
+            {
+                "role": role,
+                "content": content,
+                "tool_calls": json.loads(tool_calls) if tool_calls else None,
+                "tool_call_id": tool_call_id,
+            }
+            for role, content, tool_calls, tool_call_id in reversed(rows)
+        ]
+
+    def clear_messages(self) -> None:
+        """Delete the stored message history."""
+        with self._conn:
+            self._conn.execute("DELETE FROM messages")
+
+    def save_usage(self, stats: Dict[str, Any]) -> None:
+        """
+        Save usage statistics.
+
+        Args:
+            stats: Usage statistics to persist
+        """
+        with self._conn:
+            self._conn.execute(_UPSERT_KV, (_USAGE_KEY, json.dumps(stats)))
+
+    def load_usage(self) -> Dict[str, Any]:
+        """
+        Load usage statistics.
+
+        Returns:
+            Saved usage statistics, or an empty dict if none were saved
+        """
+        row = self._conn.execute(_SELECT_KV, (_USAGE_KEY,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
@@ -0,0 +1,72 @@
+"""
+OpsPilot Token Estimation
+
+Token counts used to budget the conversation context sent to the model.
+Uses tiktoken when its encoding is available and falls back to a
+character-based estimate otherwise.
+"""
+
+import functools
+import threading
+from typing import Callable, List, Optional
+
+_ENCODING = "cl100k_base"
+
+# tiktoken downloads its encoding on first use with no timeout, so the first
+# caller waits at most this long before falling back to the estimate
+ENCODER_LOAD_TIMEOUT_SECS = 2.0
+
+_encode: Optional[Callable[[str], List[int]]] = None
+_encoder_ready = threading.Event()
+_encoder_started = False
+_encoder_lock = threading.Lock()
+
+
+def _load_encoder() -> None:
+    """Load the tiktoken encoder, leaving it unset if it is unavailable."""
+    global _encode
+
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding(_ENCODING)
+        _encode = functools.partial(encoding.encode, disallowed_special=())
+    except Exception:
+        # tiktoken isn't installed or can't fetch its encoding offline
+        pass
+    finally:
+        _encoder_ready.set()
+
+
+def _get_encoder() -> Optional[Callable[[str], List[int]]]:
+    """Get the tiktoken encoder, or None if it isn't loaded (yet)."""
+    global _encoder_started
+
+    if not _encoder_ready.is_set():
+        with _encoder_lock:
+            first = not _encoder_started
+            _encoder_started = True
+        if first:
+            # Loaded in a daemon thread so a stalled download can't hang us
+            threading.Thread(
+                target=_load_encoder, name="tiktoken-loader", daemon=True
+            ).start()
+            _encoder_ready.wait(ENCODER_LOAD_TIMEOUT_SECS)
+
+    return _encode
+
+
+def estimate_tokens(content: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        content: Text to estimate
+
+    Returns:
+        Token count from tiktoken, or about one token per four characters
+    """
+    encode = _encode if _encoder_ready.is_set() else _get_encoder()
+    if encode is None:
+        return len(content) // 4 + 1
+    return len(encode(content))
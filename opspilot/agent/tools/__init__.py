@@ -4,7 +4,7 @@ OpsPilot Tools Module
 Contains tools for file operations and system commands.
 """
 
-from .files import file_tool
-from .system import system_tool
+from .files import file_tool, get_file_tools
+from .system import system_tool, get_system_tools
 
-__all__ = ["file_tool", "system_tool"]
+__all__ = ["file_tool", "system_tool", "get_file_tools", "get_system_tools"]
@@ -5,11 +5,142 @@ File reading, writing, and directory operations for the agent.
 Provides secure file access with proper error handling.
 """
 
+import asyncio
+import codecs
+import contextlib
+import functools
+import io
+import mmap
+import os
+import re
 import shutil
+import stat
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
+from typing import (
+    Dict,
+    Any,
+    Optional,
+    List,
+    Union,
+    AsyncIterator,
+    BinaryIO,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    Tuple,
+    TypeVar,
+)
 import mimetypes
 
+T = TypeVar("T")
+
+# Text files larger than this are memory-mapped, so lines outside the
+# requested window are counted without being decoded
+MMAP_THRESHOLD = 256 * 1024
+
+# Directory entries scanned per worker-thread hop in iter_directory
+SCAN_BATCH_SIZE = 512
+
+# A carriage return not followed by a newline, which only text mode splits on
+_BARE_CR = re.compile(rb"\r(?!\n)")
+
+
+def _take_lines(
+    lines: Iterator[T], offset: int, limit: Optional[int]
+) -> Tuple[List[T], int]:
+    """Take a window of lines from an iterator and count all of them."""
+    skipped = sum(1 for _ in islice(lines, offset))
+    window = list(islice(lines, limit)) if limit else list(lines)
+    return window, skipped + len(window) + sum(1 for _ in lines)
+
+
+def _read_lines_mmap(
+    f: BinaryIO, encoding: str, offset: int, limit: Optional[int]
+) -> Optional[Tuple[List[str], int]]:
+    """Read a window of lines from a memory-mapped text file.
+
+    Returns None for files with bare carriage returns, whose lines only
+    text mode splits correctly.
+    """
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if _BARE_CR.search(mm):
+            return None
+        raw_lines, total_lines = _take_lines(iter(mm.readline, b""), offset, limit)
+
+    # Match the newline translation of files opened in text mode
+    lines = [
+        line.decode(encoding, errors="replace").replace("\r\n", "\n")
+        for line in raw_lines
+    ]
+    return lines, total_lines
+
+
+@functools.lru_cache(maxsize=32)
+def _splits_on_newline_bytes(encoding: str) -> bool:
+    """Check if an encoding's lines can be split on b"\\n" before decoding."""
+    try:
+        return codecs.lookup(encoding).name in {"utf-8", "ascii", "iso8859-1"}
+    except LookupError:
+        return False
+
+
+def _copy_file(src: str, dst: str) -> None:
+    """Copy a file and its metadata, letting the kernel move the data."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            # Unsupported by the kernel or filesystem; copy2 rewrites dst
+            pass
+
+    shutil.copy2(src, dst)
+
+
+def _write_bytes(path: str, data: bytes, fsync: bool = False) -> None:
+    """Write bytes straight to a file descriptor, bypassing buffered I/O."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Paths outside the base path that may still be accessed
+_ALLOWED_PREFIXES = ("/home/", "/tmp/", "/var/tmp/")
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_path_safe(path_str: str, base_str: str, restricted: Tuple[str, ...]) -> bool:
+    """Check if a resolved path is safe for access, cached per path."""
+    if path_str.startswith(restricted):
+        return False
+
+    # Paths inside the base path are allowed
+    if os.path.isabs(base_str) and os.path.commonpath((path_str, base_str)) == base_str:
+        return True
+
+    # Outside the base path, allow user home and temp directories
+    return path_str.startswith(_ALLOWED_PREFIXES)
+
+
+@functools.lru_cache(maxsize=512)
+def _guess_mime(extension: str) -> str:
+    """Guess a MIME type from a file extension, cached per extension."""
+    return mimetypes.guess_type("file" + extension)[0] or "unknown"
+
 
 class FileTool:
     """File operations tool for the agent."""
@@ -22,6 +153,9 @@ class FileTool:
             base_path: Base path for file operations (default: current directory)
         """
         self.base_path = Path(base_path) if base_path else Path.cwd()
+        # Paths are handled as strings internally; Path objects cost an
+        # allocation per operation
+        self._base_str = str(self.base_path)
 
         # Restricted paths for security
         self.restricted_paths = {
@@ -39,6 +173,18 @@ class FileTool:
             "/sbin",
         }
 
+    @property
+    def restricted_paths(self) -> FrozenSet[str]:
+        """Path prefixes the tool refuses to access."""
+        return self._restricted_paths
+
+    @restricted_paths.setter
+    def restricted_paths(self, paths: Iterable[str]) -> None:
+        self._restricted_paths = frozenset(paths)
+        # Kept in step with the set, so the cached safety check never sees a
+        # stale tuple; str.startswith takes it in one C-level call
+        self._restricted_prefixes = tuple(sorted(self._restricted_paths))
+
     async def read_file(
         self,
         file_path: str,
@@ -58,6 +204,25 @@ class FileTool:
         Returns:
             Dictionary with file contents and metadata
         """
+        return await asyncio.to_thread(
+            self._read_file_sync, file_path, encoding, offset, limit
+        )
+
+    def _read_file_sync(
+        self,
+        file_path: str,
+        encoding: str,
+        offset: int,
+        limit: Optional[int],
+    ) -> Dict[str, Any]:
+        """Read file contents, blocking the calling thread."""
+        if offset < 0 or (limit is not None and limit < 0):
+            return {
+                "success": False,
+                "error": "offset and limit must not be negative",
+                "file_path": file_path,
+            }
+
         try:
             full_path = self._resolve_path(file_path)
 
@@ -69,8 +234,10 @@ class FileTool:
                     "file_path": file_path,
                 }
 
-            # Check if file exists
-            if not full_path.exists():
+            # One stat answers existence, type and metadata
+            try:
+                st = os.stat(full_path)
+            except FileNotFoundError:
                 return {
                     "success": False,
                     "error": "File not found",
@@ -78,7 +245,7 @@ class FileTool:
                 }
 
             # Check if it's a file
-            if not full_path.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return {
                     "success": False,
                     "error": "Path is not a file",
@@ -86,7 +253,7 @@ class FileTool:
                 }
 
             # Get file info
-            file_info = self._get_file_info(full_path)
+            file_info = self._file_info_from_stat(full_path, st)
 
             # Read file content
             if file_info["size"] > 10 * 1024 * 1024:  # 10MB limit
@@ -97,39 +264,37 @@ class FileTool:
                     "file_info": file_info,
                 }
 
-            # Determine if file is binary
-            if self._is_binary_file(full_path):
-                with open(full_path, "rb") as f:
-                    content = f.read()
-                return {
-                    "success": True,
-                    "content": content,
-                    "encoding": "binary",
-                    "file_info": file_info,
-                    "file_path": file_path,
-                }
-
-            # Read text file
-            with open(full_path, "r", encoding=encoding, errors="replace") as f:
-                lines: list[str] = f.readlines()
-
-            # Apply offset and limit
-            if offset > 0 or limit is not None:
-                end = (offset + limit) if limit else None
-                lines = lines[offset:end]
-
-            content = "".join(lines)  # type: ignore[assignment]
+            with open(full_path, "rb") as f:
+                # Determine if file is binary from its first block
+                head = f.read(1024)
+                if b"\0" in head:
+                    return {
+                        "success": True,
+                        "content": head + f.read(),
+                        "encoding": "binary",
+                        "file_info": file_info,
+                        "file_path": file_path,
+                    }
+
+                # Read text file from the same handle, keeping only the
+                # requested window of lines and counting the rest in one pass
+                f.seek(0)
+                window = None
+                if file_info["size"] > MMAP_THRESHOLD and _splits_on_newline_bytes(
+                    encoding
+                ):
+                    window = _read_lines_mmap(f, encoding, offset, limit)
+                if window is None:
+                    text = io.TextIOWrapper(f, encoding=encoding, errors="replace")
+                    window = _take_lines(text, offset, limit)
+                lines, total_lines = window
 
             return {
                 "success": True,
-                "content": content,
+                "content": "".join(lines),
                 "encoding": encoding,
                 "lines_read": len(lines),
-                "total_lines": len(
-                    open(
-                        full_path, "r", encoding=encoding, errors="replace"
-                    ).readlines()
-                ),
+                "total_lines": total_lines,
                 "file_info": file_info,
                 "file_path": file_path,
             }
@@ -137,6 +302,25 @@ class FileTool:
         except Exception as e:
             return {"success": False, "error": str(e), "file_path": file_path}
 
+    async def read_files(
+        self, file_paths: List[str], encoding: str = "utf-8"
+    ) -> List[Dict[str, Any]]:
+        """
+        Read several files concurrently.
+
+        Args:
+            file_paths: Paths of the files to read
+            encoding: File encoding (default: utf-8)
+
+        Returns:
+            One read_file result per path, in the same order
+        """
+        return list(
+            await asyncio.gather(
+                *(self.read_file(file_path, encoding) for file_path in file_paths)
+            )
+        )
+
     async def write_file(
         self,
         file_path: str,
@@ -144,6 +328,7 @@ class FileTool:
         encoding: str = "utf-8",
         create_dirs: bool = True,
         backup: bool = True,
+        fsync: bool = False,
     ) -> Dict[str, Any]:
         """
         Write content to file safely.
@@ -154,10 +339,31 @@ class FileTool:
             encoding: File encoding for text content (default: utf-8)
             create_dirs: Create parent directories if they don't exist
             backup: Create backup of existing file
+            fsync: Flush the written data to disk before returning
 
         Returns:
             Dictionary with operation result
         """
+        return await asyncio.to_thread(
+            self._write_file_sync,
+            file_path,
+            content,
+            encoding,
+            create_dirs,
+            backup,
+            fsync,
+        )
+
+    def _write_file_sync(
+        self,
+        file_path: str,
+        content: Union[str, bytes],
+        encoding: str,
+        create_dirs: bool,
+        backup: bool,
+        fsync: bool,
+    ) -> Dict[str, Any]:
+        """Write content to file, blocking the calling thread."""
         try:
             full_path = self._resolve_path(file_path)
 
@@ -171,33 +377,32 @@ class FileTool:
 
             # Create parent directories if needed
             if create_dirs:
-                full_path.parent.mkdir(parents=True, exist_ok=True)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
 
             # Create backup if file exists
             backup_path = None
-            if backup and full_path.exists():
-                backup_path = full_path.with_suffix(full_path.suffix + ".backup")
-                shutil.copy2(full_path, backup_path)
-
-            # Write content
+            if backup:
+                backup_path = full_path + ".backup"
+                try:
+                    _copy_file(full_path, backup_path)
+                except FileNotFoundError:
+                    backup_path = None
+
+            # Write content, encoding text once so its size is known
             if isinstance(content, bytes):
-                with open(full_path, "wb") as f:
-                    f.write(content)
+                data = content
                 encoding_used = "binary"
             else:
-                with open(full_path, "w", encoding=encoding) as f:
-                    f.write(content)
+                data = content.encode(encoding)
                 encoding_used = encoding
 
+            _write_bytes(full_path, data, fsync)
+
             return {
                 "success": True,
                 "file_path": file_path,
                 "encoding": encoding_used,
-                "bytes_written": (
-                    len(content)
-                    if isinstance(content, bytes)
-                    else len(content.encode(encoding))
-                ),
+                "bytes_written": len(data),
                 "backup_path": str(backup_path) if backup_path else None,
             }
 
@@ -219,42 +424,10 @@ class FileTool:
             Dictionary with directory listing
         """
         try:
-            full_path = self._resolve_path(dir_path)
-
-            # Security check
-            if not self._is_path_safe(full_path):
-                return {
-                    "success": False,
-                    "error": "Access denied - path is restricted",
-                    "dir_path": dir_path,
-                }
-
-            if not full_path.exists():
-                return {
-                    "success": False,
-                    "error": "Directory not found",
-                    "dir_path": dir_path,
-                }
-
-            if not full_path.is_dir():
-                return {
-                    "success": False,
-                    "error": "Path is not a directory",
-                    "dir_path": dir_path,
-                }
-
-            items = []
-
-            if recursive:
-                for item in full_path.rglob("*"):
-                    if not show_hidden and item.name.startswith("."):
-                        continue
-                    items.append(self._get_item_info(item))
-            else:
-                for item in full_path.iterdir():
-                    if not show_hidden and item.name.startswith("."):
-                        continue
-                    items.append(self._get_item_info(item))
+            items = [
+                item
+                async for item in self.iter_directory(dir_path, show_hidden, recursive)
+            ]
 
             return {
                 "success": True,
@@ -266,6 +439,55 @@ class FileTool:
         except Exception as e:
             return {"success": False, "error": str(e), "dir_path": dir_path}
 
+    async def iter_directory(
+        self, dir_path: str = ".", show_hidden: bool = False, recursive: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over directory contents without building the whole listing.
+
+        Args:
+            dir_path: Directory path to list
+            show_hidden: Include hidden files
+            recursive: List recursively
+
+        Yields:
+            Item info, as in list_directory's items
+
+        Raises:
+            PermissionError: If the path is restricted
+            FileNotFoundError: If the directory doesn't exist
+            NotADirectoryError: If the path is not a directory
+        """
+        full_path = self._resolve_path(dir_path)
+
+        # Security check
+        if not self._is_path_safe(full_path):
+            raise PermissionError("Access denied - path is restricted")
+
+        try:
+            st = os.stat(full_path)
+        except FileNotFoundError:
+            raise FileNotFoundError("Directory not found") from None
+
+        if not stat.S_ISDIR(st.st_mode):
+            raise NotADirectoryError("Path is not a directory")
+
+        # The walk runs in a worker thread a batch at a time, so large trees
+        # don't block the event loop
+        entries = self._scan_directory(full_path, show_hidden, recursive)
+        try:
+            while batch := await asyncio.to_thread(
+                lambda: list(islice(entries, SCAN_BATCH_SIZE))
+            ):
+                for item in batch:
+                    yield item
+        finally:
+            # Closing releases the open scandir handles, which is blocking
+            # work too. A batch still running after a cancellation keeps the
+            # walk busy; it is then closed when collected.
+            with contextlib.suppress(ValueError):
+                await asyncio.to_thread(entries.close)
+
     async def delete_file(
         self, file_path: str, confirm: bool = False
     ) -> Dict[str, Any]:
@@ -297,17 +519,19 @@ class FileTool:
                     "file_path": file_path,
                 }
 
-            if not full_path.exists():
+            try:
+                st = os.stat(full_path)
+            except FileNotFoundError:
                 return {
                     "success": False,
                     "error": "Path not found",
                     "file_path": file_path,
                 }
 
-            if full_path.is_file():
-                full_path.unlink()
+            if stat.S_ISREG(st.st_mode):
+                os.unlink(full_path)
                 deleted_type = "file"
-            elif full_path.is_dir():
+            elif stat.S_ISDIR(st.st_mode):
                 shutil.rmtree(full_path)
                 deleted_type = "directory"
             else:
@@ -326,73 +550,86 @@ class FileTool:
         except Exception as e:
             return {"success": False, "error": str(e), "file_path": file_path}
 
-    def _resolve_path(self, file_path: str) -> Path:
+    def _resolve_path(self, file_path: str) -> str:
         """Resolve file path relative to base path."""
-        path = Path(file_path)
-        if not path.is_absolute():
-            path = self.base_path / path
-        return path.resolve()
+        # join() keeps file_path as is when it is already absolute
+        path = os.path.abspath(os.path.join(self._base_str, file_path))
 
-    def _is_path_safe(self, path: Path) -> bool:
+        # Resolving symlinks stats every component; a path that is restricted
+        # as written is refused anyway, so it skips that
+        if path.startswith(self._restricted_prefixes):
+            return path
+        return os.path.realpath(path)
+
+    def _is_path_safe(self, path: str) -> bool:
         """Check if path is safe for access."""
-        path_str = str(path)
+        return _is_path_safe(path, self._base_str, self._restricted_prefixes)
 
-        # Check against restricted paths
-        for restricted in self.restricted_paths:
-            if path_str.startswith(restricted):
-                return False
+    def _file_info_from_stat(self, path: str, st: os.stat_result) -> Dict[str, Any]:
+        """Get file metadata from an existing stat result."""
+        extension = os.path.splitext(path)[1]
 
-        # Ensure path doesn't try to go above base path
-        try:
-            path.relative_to(self.base_path)
-        except ValueError:
-            # Path is outside base path, but might still be safe
-            # Allow user home directory and temp directory
-            allowed_prefixes = ["/home/", "/tmp/", "/var/tmp/"]
-            if not any(path_str.startswith(prefix) for prefix in allowed_prefixes):
-                return False
+        return {
+            "size": st.st_size,
+            "modified": st.st_mtime,
+            "created": st.st_ctime,
+            "is_file": stat.S_ISREG(st.st_mode),
+            "is_dir": stat.S_ISDIR(st.st_mode),
+            "mime_type": _guess_mime(extension),
+            "extension": extension,
+        }
 
-        return True
+    def _scan_directory(
+        self, dir_path: str, show_hidden: bool, recursive: bool
+    ) -> Iterator[Dict[str, Any]]:
+        """Walk directory items with os.scandir, which caches each entry's type."""
+        pending = [dir_path]
+
+        while pending:
+            current = pending.pop()
+            relative_dir = os.path.relpath(current, self._base_str)
+            try:
+                scan = os.scandir(current)
+            except PermissionError:
+                # Unreadable subdirectories are skipped, as rglob did
+                if current == dir_path:
+                    raise
+                continue
+            with scan as entries:
+                for entry in entries:
+                    if not show_hidden and entry.name.startswith("."):
+                        continue
+                    yield self._get_entry_info(entry, relative_dir)
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
 
-    def _get_file_info(self, path: Path) -> Dict[str, Any]:
-        """Get file metadata."""
-        stat = path.stat()
+    def _get_entry_info(self, entry: os.DirEntry, relative_dir: str) -> Dict[str, Any]:
+        """Get item info for directory listing from a scandir entry."""
+        st = entry.stat(follow_symlinks=False)
+        extension = os.path.splitext(entry.name)[1]
 
         return {
-            "size": stat.st_size,
-            "modified": stat.st_mtime,
-            "created": stat.st_ctime,
-            "is_file": path.is_file(),
-            "is_dir": path.is_dir(),
-            "mime_type": mimetypes.guess_type(str(path))[0] or "unknown",
-            "extension": path.suffix,
+            "size": st.st_size,
+            "modified": st.st_mtime,
+            "created": st.st_ctime,
+            "is_file": entry.is_file(follow_symlinks=False),
+            "is_dir": entry.is_dir(follow_symlinks=False),
+            "mime_type": _guess_mime(extension),
+            "extension": extension,
+            "name": entry.name,
+            "path": entry.path,
+            "relative_path": os.path.normpath(os.path.join(relative_dir, entry.name)),
         }
 
-    def _get_item_info(self, path: Path) -> Dict[str, Any]:
-        """Get item info for directory listing."""
-        info = self._get_file_info(path)
-        info.update(
-            {
-                "name": path.name,
-                "path": str(path),
-                "relative_path": str(path.relative_to(self.base_path)),
-            }
-        )
-        return info
-
-    def _is_binary_file(self, path: Path) -> bool:
-        """Check if file is binary."""
-        try:
-            with open(path, "rb") as f:
-                chunk = f.read(1024)
-                return b"\0" in chunk
-        except Exception:
-            return True
-
 
 # Tool definitions for agent integration
+@functools.lru_cache(maxsize=None)
 def get_file_tool_definitions() -> List[Dict[str, Any]]:
-    """Get tool definitions for file operations."""
+    """Get tool definitions for file operations.
+
+    The definitions are built once and shared between callers, so treat
+    them as read-only.
+    """
     return [
         {
             "type": "function",
@@ -425,6 +662,29 @@ def get_file_tool_definitions() -> List[Dict[str, Any]]:
                 },
             },
         },
+        {
+            "type": "function",
+            "function": {
+                "name": "read_files",
+                "description": "Read several files at once",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "file_paths": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Paths of the files to read",
+                        },
+                        "encoding": {
+                            "type": "string",
+                            "description": "File encoding (default: utf-8)",
+                            "default": "utf-8",
+                        },
+                    },
+                    "required": ["file_paths"],
+                },
+            },
+        },
         {
             "type": "function",
             "function": {
@@ -494,3 +754,25 @@ def get_file_tool_definitions() -> List[Dict[str, Any]]:
 
 # Global file tool instance
 file_tool = FileTool()
+
+
+def get_file_tools(tool: Optional[FileTool] = None) -> List[Dict[str, Any]]:
+    """Get file operations as entries for AgentCore.register_tool.
+
+    Args:
+        tool: File tool to bind the entries to (default: the global one)
+
+    Returns:
+        One entry per tool definition
+    """
+    tool = tool or file_tool
+    return [
+        {
+            **definition["function"],
+            "function": getattr(tool, definition["function"]["name"]),
+            "requires_build_mode": definition["function"]["name"] == "write_file",
+            # Reads may run alongside each other; writes keep their turn
+            "parallel_safe": definition["function"]["name"] != "write_file",
+        }
+        for definition in get_file_tool_definitions()
+    ]
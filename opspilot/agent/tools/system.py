@@ -6,12 +6,65 @@ Provides shell command execution capabilities for DevOps tasks.
 """
 
 import asyncio
+import functools
+import re
+import shutil
 import subprocess
 import shlex
-from typing import Dict, Any, Optional, List, Callable, Awaitable
+from typing import (
+    Dict,
+    Any,
+    Optional,
+    List,
+    Callable,
+    Awaitable,
+    Tuple,
+    FrozenSet,
+    Iterable,
+)
 from pathlib import Path
 import os
 
+# Output kept from each of a command's stdout and stderr; the rest is drained
+# and discarded so chatty commands can't exhaust memory
+MAX_OUTPUT_BYTES = 8 * 1024 * 1024
+
+# Command families that stay dangerous with extra letters around the keyword,
+# e.g. rmdir, sudoedit, helmfile, gpasswd, telinit and sfdisk. Every other
+# keyword has to match a whole word, so "su" doesn't flag "summary" and "at"
+# doesn't flag "attach".
+DANGEROUS_PREFIXES = ("rm", "sudo", "helm")
+DANGEROUS_SUFFIXES = ("passwd", "init", "fdisk")
+
+
+async def _read_capped(stream: asyncio.StreamReader, limit: int) -> Tuple[bytes, bool]:
+    """Read a stream to the end, keeping at most limit bytes."""
+    buffer = bytearray()
+    truncated = False
+    while chunk := await stream.read(65536):
+        room = limit - len(buffer)
+        if len(chunk) > room:
+            truncated = True
+        if room > 0:
+            buffer += chunk[:room]
+    return bytes(buffer), truncated
+
+
+@functools.lru_cache(maxsize=256)
+def _command_exists(command: str, search_path: str) -> bool:
+    """Look a command up on a PATH, cached per command and PATH."""
+    return shutil.which(command, path=search_path) is not None
+
+
+def _wait_or_kill(process: subprocess.Popen, timeout: float) -> None:
+    """Wait for a terminated process to exit, killing it after the timeout."""
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        # Force kill if still running
+        process.kill()
+        process.wait()
+
 
 class SystemTool:
     """Secure system tool for subprocess execution."""
@@ -51,18 +104,53 @@ class SystemTool:
             "sudo",
             "su",
             "passwd",
+            "chpasswd",
+            "userdel",
+            "groupdel",
             "crontab",
             "at",
             "batch",
             "nohup",
         }
 
+    @property
+    def dangerous_keywords(self) -> FrozenSet[str]:
+        """Keywords that make a command require confirmation."""
+        return self._dangerous_keywords
+
+    @dangerous_keywords.setter
+    def dangerous_keywords(self, keywords: Iterable[str]) -> None:
+        self._dangerous_keywords = frozenset(keywords)
+        # Rebuilt with the set, so the safety check never uses a stale pattern.
+        # One alternation scans the command once instead of once per keyword;
+        # longer keywords come first so "docker rm" is reported over "rm".
+        ordered = sorted(
+            {keyword.lower() for keyword in self._dangerous_keywords},
+            key=len,
+            reverse=True,
+        )
+        alternatives = [
+            r"(?P<word>" + "|".join(re.escape(keyword) for keyword in ordered) + r")\b"
+        ]
+        prefixes = [keyword for keyword in DANGEROUS_PREFIXES if keyword in ordered]
+        if prefixes:
+            alternatives.append(
+                r"(?P<prefix>" + "|".join(map(re.escape, prefixes)) + r")\w*"
+            )
+        suffixes = [keyword for keyword in DANGEROUS_SUFFIXES if keyword in ordered]
+        if suffixes:
+            alternatives.append(
+                r"\w*?(?P<suffix>" + "|".join(map(re.escape, suffixes)) + r")\b"
+            )
+        self._dangerous_re = re.compile(r"\b(?:" + "|".join(alternatives) + r")")
+
     async def execute_command(
         self,
         command: str,
         timeout: float = 30.0,
         capture_output: bool = True,
         working_directory: Optional[str] = None,
+        max_output_bytes: int = MAX_OUTPUT_BYTES,
     ) -> Dict[str, Any]:
         """
         Execute a shell command securely.
@@ -72,6 +160,7 @@ class SystemTool:
             timeout: Command timeout in seconds
             capture_output: Whether to capture stdout/stderr
             working_directory: Directory to execute command in
+            max_output_bytes: Bytes kept from each of stdout and stderr
 
         Returns:
             Dictionary with execution results
@@ -79,8 +168,17 @@ class SystemTool:
         # Ensure timeout is a float
         timeout = float(timeout)
 
+        # Prepare command once for both the safety check and execution
+        try:
+            if isinstance(command, str):
+                args = shlex.split(command)
+            else:
+                args = [str(arg) for arg in command]  # type: ignore[unreachable]
+        except ValueError as e:
+            return {"success": False, "error": str(e), "command": command}
+
         # Safety check
-        if not await self._safety_check(command):
+        if not await self._safety_check(command, args):
             return {
                 "success": False,
                 "error": "Command blocked by safety check",
@@ -88,19 +186,14 @@ class SystemTool:
             }
 
         try:
-            # Prepare command
-            if isinstance(command, str):
-                args = shlex.split(command)
-            else:
-                args = [str(arg) for arg in command]  # type: ignore[unreachable]
-
             # Set working directory
             cwd = Path(working_directory) if working_directory else Path.cwd()
 
             # Execute command
             if capture_output:
                 result = await asyncio.wait_for(
-                    self._capture_output(args, cwd), timeout=timeout
+                    self._capture_output(args, cwd, max_output_bytes),
+                    timeout=timeout,
                 )
             else:
                 result = await asyncio.wait_for(
@@ -118,30 +211,48 @@ class SystemTool:
         except Exception as e:
             return {"success": False, "error": str(e), "command": command}
 
-    async def _safety_check(self, command: str) -> bool:
+    async def _safety_check(self, command: str, args: List[str]) -> bool:
         """
         Perform safety check on command.
 
         Args:
             command: Command to check
+            args: The command split into arguments
 
         Returns:
             True if command is safe, False otherwise
         """
-        command_lower = command.lower()
+        # The raw string keeps shell punctuation; argument lists are joined
+        text = command if isinstance(command, str) else " ".join(args)
 
         # Check for dangerous keywords
-        for keyword in self.dangerous_keywords:
-            if keyword in command_lower:
-                # Request confirmation
-                if self.confirmation_callback:
-                    return await self._request_confirmation(command, keyword)
-                else:
-                    # Log warning but allow
-                    return True
+        keyword = self._is_dangerous(text)
+        if keyword:
+            # Request confirmation
+            if self.confirmation_callback:
+                return await self._request_confirmation(command, keyword)
+            else:
+                # Log warning but allow
+                return True
 
         return True
 
+    def _is_dangerous(self, text: str) -> Optional[str]:
+        """
+        Find the dangerous keyword in a command, if any.
+
+        Args:
+            text: Command line to scan
+
+        Returns:
+            The matched keyword, or None if the command looks safe
+        """
+        if not self._dangerous_keywords:
+            return None
+        match = self._dangerous_re.search(text.lower())
+        # Each alternative has one named group, holding the keyword it matched
+        return match.group(match.lastgroup) if match else None
+
     async def _request_confirmation(self, command: str, keyword: str) -> bool:
         """
         Request user confirmation for dangerous command.
@@ -159,8 +270,10 @@ class SystemTool:
         # Default to safe behavior
         return False
 
-    async def _capture_output(self, args: List[str], cwd: Path) -> Dict[str, Any]:
-        """Execute command and capture output."""
+    async def _capture_output(
+        self, args: List[str], cwd: Path, max_output_bytes: int = MAX_OUTPUT_BYTES
+    ) -> Dict[str, Any]:
+        """Execute command and capture output, keeping at most max_output_bytes."""
         try:
             process = await asyncio.create_subprocess_exec(
                 *args,
@@ -169,13 +282,28 @@ class SystemTool:
                 cwd=cwd,
             )
 
-            stdout, stderr = await process.communicate()
+            try:
+                assert process.stdout is not None and process.stderr is not None
+                (stdout, stdout_truncated), (stderr, stderr_truncated) = (
+                    await asyncio.gather(
+                        _read_capped(process.stdout, max_output_bytes),
+                        _read_capped(process.stderr, max_output_bytes),
+                    )
+                )
+                await process.wait()
+            except asyncio.CancelledError:
+                # Timed out; don't leave the command running
+                if process.returncode is None:
+                    process.kill()
+                raise
 
             return {
                 "success": process.returncode == 0,
                 "return_code": process.returncode,
                 "stdout": stdout.decode("utf-8", errors="replace"),
                 "stderr": stderr.decode("utf-8", errors="replace"),
+                "stdout_truncated": stdout_truncated,
+                "stderr_truncated": stderr_truncated,
                 "command": " ".join(args) if hasattr(shlex, "join") else " ".join(args),
             }
         except Exception as e:
@@ -229,20 +357,8 @@ class SystemTool:
             process = self.running_processes[process_id]
             process.terminate()
 
-            # Wait for graceful termination
-            import time
-
-            start_time = time.time()
-            while time.time() - start_time < 5.0:
-                if process.poll() is not None:
-                    break
-                await asyncio.sleep(0.1)
-
-            if process.poll() is None:
-                # Force kill if still running
-                process.kill()
-                # Wait a bit more for the kill to take effect
-                await asyncio.sleep(0.5)
+            # Wait for graceful termination off the event loop
+            await asyncio.to_thread(_wait_or_kill, process, 5.0)
 
             del self.running_processes[process_id]
             return True
@@ -271,17 +387,7 @@ class SystemTool:
         Returns:
             True if command exists, False otherwise
         """
-        try:
-            result = await asyncio.create_subprocess_exec(
-                "which",
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            await result.communicate()
-            return result.returncode == 0
-        except Exception:
-            return False
+        return _command_exists(command, os.environ.get("PATH", ""))
 
     def get_system_info(self) -> Dict[str, Any]:
         """Get basic system information."""
@@ -295,8 +401,13 @@ class SystemTool:
 
 
 # Tool definition for agent integration
+@functools.lru_cache(maxsize=None)
 def get_system_tool_definition() -> Dict[str, Any]:
-    """Get tool definition for system operations."""
+    """Get tool definition for system operations.
+
+    The definition is built once and shared between callers, so treat it
+    as read-only.
+    """
     return {
         "type": "function",
         "function": {
@@ -332,3 +443,25 @@ def get_system_tool_definition() -> Dict[str, Any]:
 
 # Global system tool instance
 system_tool = SystemTool()
+
+
+def get_system_tools(tool: Optional[SystemTool] = None) -> List[Dict[str, Any]]:
+    """Get system operations as entries for AgentCore.register_tool.
+
+    Args:
+        tool: System tool to bind the entries to (default: the global one)
+
+    Returns:
+        One entry per tool definition
+    """
+    tool = tool or system_tool
+    definition = get_system_tool_definition()["function"]
+    # Commands can change the system, so they run one at a time in build mode
+    return [
+        {
+            **definition,
+            "function": tool.execute_command,
+            "requires_build_mode": True,
+            "parallel_safe": False,
+        }
+    ]
@@ -5,15 +5,62 @@ Simple authentication with provider selection and API key management.
 Supports multiple AI providers through litellm integration.
 """
 
+import functools
+import json
+import logging
 import os
-import yaml
 from pathlib import Path
-from typing import Optional, Dict, Any, Literal
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Literal, Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Parsed configs by file, with the modification time they were read at, so
+# every ConfigManager in the process shares one parse per file version
+_CONFIG_CACHE: Dict[Path, Tuple[int, "AppConfig"]] = {}
+
+
+# Available models for each provider
+# OpenRouter provides access to many models from different providers
+_MODEL_TABLE: Mapping[str, Mapping[str, str]] = MappingProxyType(
+    {
+        "openai": MappingProxyType({"plan": "gpt-4o", "build": "gpt-4o-mini"}),
+        "zhipu": MappingProxyType(
+            {
+                "plan": "openrouter/z-ai/glm-4.6",
+                "build": "openrouter/z-ai/glm-4.6",
+            }
+        ),
+        "anthropic": MappingProxyType(
+            {
+                "plan": "claude-sonnet-4-5",
+                "build": "claude-opus-4-1",
+            }
+        ),
+        "openrouter": MappingProxyType(
+            {
+                "plan": "openai/gpt-4o",  # GPT-4 Optimized via OpenRouter
+                "build": "openai/gpt-4o-mini",  # Fast OpenAI model via OpenRouter
+            }
+        ),
+    }
+)
+
+# (provider, mode) -> model, for a single lookup per request
+_MODEL_LOOKUP: Mapping[Tuple[str, str], str] = MappingProxyType(
+    {
+        (provider, mode): model
+        for provider, modes in _MODEL_TABLE.items()
+        for mode, model in modes.items()
+    }
+)
 
 
 class AuthConfig:
     """Simple authentication configuration."""
 
+    __slots__ = ("api_key", "provider", "model")
+
     def __init__(self, **kwargs: Any) -> None:
         # API Key - User provides their own API key
         self.api_key = kwargs.get("api_key")
@@ -30,61 +77,91 @@ class AuthConfig:
 class ModelConfig:
     """Model configuration for different providers."""
 
+    __slots__ = ("models",)
+
     def __init__(self, **kwargs: Any) -> None:
-        # Available models for each provider
-        # OpenRouter provides access to many models from different providers
-        self.models = {
-            "openai": {"plan": "gpt-4o", "build": "gpt-4o-mini"},
-            "zhipu": {
-                "plan": "openrouter/z-ai/glm-4.6",
-                "build": "openrouter/z-ai/glm-4.6",
-            },
-            "anthropic": {
-                "plan": "claude-sonnet-4-5",
-                "build": "claude-opus-4-1",
-            },
-            "openrouter": {
-                "plan": "openai/gpt-4o",  # GPT-4 Optimized via OpenRouter
-                "build": "openai/gpt-4o-mini",  # Fast OpenAI model via OpenRouter
-            },
-        }
+        # Available models for each provider, shared unless overridden
+        self.models: Mapping[str, Mapping[str, str]] = (
+            kwargs.get("models") or _MODEL_TABLE
+        )
 
 
 class AppConfig:
     """Complete application configuration."""
 
+    __slots__ = (
+        "auth",
+        "models",
+        "max_tokens",
+        "temperature",
+        "timeout",
+        "cache_enabled",
+        "persist_history",
+    )
+
     def __init__(self, **kwargs: Any) -> None:
         self.auth = kwargs.get("auth", AuthConfig())
-        self.models = kwargs.get("models", ModelConfig())
+        self.models = kwargs.get("models") or ModelConfig()
 
         # Application settings
         self.max_tokens = kwargs.get("max_tokens", 4000)
         self.temperature = kwargs.get("temperature", 0.7)
         self.timeout = kwargs.get("timeout", 30)
+        self.cache_enabled = kwargs.get("cache_enabled", False)
+        self.persist_history = kwargs.get("persist_history", False)
 
     def dict(self) -> Dict[str, Any]:
         """Convert config to dictionary for serialization."""
+        # The model table is defined in code and restored on load, so it
+        # is not written out
         return {
             "auth": {
                 "api_key": self.auth.api_key,
                 "provider": self.auth.provider,
                 "model": self.auth.model,
             },
-            "models": {
-                "models": self.models.models,
-            },
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
             "timeout": self.timeout,
+            "cache_enabled": self.cache_enabled,
+            "persist_history": self.persist_history,
         }
 
 
+def _config_from_dict(config_data: Dict[str, Any]) -> AppConfig:
+    """Build an AppConfig from its serialized form."""
+    # Properly reconstruct nested objects
+    auth_data = config_data.get("auth", {})
+    auth = AuthConfig(**auth_data)
+    return AppConfig(
+        auth=auth,
+        models=ModelConfig(),
+        max_tokens=config_data.get("max_tokens", 4000),
+        temperature=config_data.get("temperature", 0.7),
+        timeout=config_data.get("timeout", 30),
+        cache_enabled=config_data.get("cache_enabled", False),
+        persist_history=config_data.get("persist_history", False),
+    )
+
+
+def _load_yaml(path: Path) -> Dict[str, Any]:
+    """Read a legacy YAML config file."""
+    # Only needed for migration, so keep PyYAML off the startup path
+    import yaml
+
+    # libyaml's C loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
 class ConfigManager:
     """Manages OpsPilot configuration loading and validation."""
 
     def __init__(self) -> None:
         self.config_dir = Path.home() / ".opspilot"
-        self.config_file = self.config_dir / "config.yaml"
+        self.config_file = self.config_dir / "config.json"
+        self._legacy_yaml = self.config_dir / "config.yaml"
         self._config: Optional[AppConfig] = None
 
     def ensure_config_dir(self) -> None:
@@ -98,24 +175,31 @@ class ConfigManager:
 
         self.ensure_config_dir()
 
-        if self.config_file.exists():
+        try:
+            mtime = self.config_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime is not None:
+            cached = _CONFIG_CACHE.get(self.config_file)
+            if cached and cached[0] == mtime:
+                self._config = cached[1]
+                return self._config
+
             try:
                 with open(self.config_file, "r", encoding="utf-8") as f:
-                    config_data = yaml.safe_load(f)
-                # Properly reconstruct nested objects
-                auth_data = config_data.get("auth", {})
-                auth = AuthConfig(**auth_data)
-                models_data = config_data.get("models", {})
-                models = ModelConfig(**models_data)
-                self._config = AppConfig(
-                    auth=auth,
-                    models=models,
-                    max_tokens=config_data.get("max_tokens", 4000),
-                    temperature=config_data.get("temperature", 0.7),
-                    timeout=config_data.get("timeout", 30),
-                )
+                    self._config = _config_from_dict(json.load(f))
+            except Exception as e:
+                raise ValueError(f"Invalid configuration file: {e}")
+            _CONFIG_CACHE[self.config_file] = (mtime, self._config)
+            self._warn_if_legacy_yaml_newer(mtime)
+        elif self._legacy_yaml.exists():
+            # Migrate a config.yaml from older releases to JSON once
+            try:
+                self._config = _config_from_dict(_load_yaml(self._legacy_yaml))
             except Exception as e:
                 raise ValueError(f"Invalid configuration file: {e}")
+            self.save_config(self._config)
         else:
             # Create default configuration
             self._config = self._create_default_config()
@@ -123,15 +207,29 @@ class ConfigManager:
 
         return self._config
 
+    def _warn_if_legacy_yaml_newer(self, mtime: int) -> None:
+        """Warn when config.yaml was edited after its migration to JSON."""
+        try:
+            yaml_mtime = self._legacy_yaml.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        if yaml_mtime > mtime:
+            logger.warning(
+                "%s is newer than %s but is no longer read; move your changes to %s",
+                self._legacy_yaml,
+                self.config_file,
+                self.config_file.name,
+            )
+
     def _create_default_config(self) -> AppConfig:
         """Create default configuration with environment variables."""
-        auth_data = {}
-
         # Check for environment variables
-        if os.getenv("OPSPILOT_API_KEY"):
-            auth_data["api_key"] = os.getenv("OPSPILOT_API_KEY")
-        if os.getenv("OPSPILOT_PROVIDER"):
-            auth_data["provider"] = os.getenv("OPSPILOT_PROVIDER")
+        env_auth = (
+            ("api_key", os.environ.get("OPSPILOT_API_KEY")),
+            ("provider", os.environ.get("OPSPILOT_PROVIDER")),
+        )
+        auth_data = {key: value for key, value in env_auth if value}
 
         if not auth_data:
             # No auth found - create empty config to trigger setup
@@ -144,9 +242,10 @@ class ConfigManager:
         self.ensure_config_dir()
 
         with open(self.config_file, "w", encoding="utf-8") as f:
-            yaml.dump(config.dict(), f, default_flow_style=False, indent=2)
+            json.dump(config.dict(), f, indent=2)
 
         self._config = config
+        _CONFIG_CACHE[self.config_file] = (self.config_file.stat().st_mtime_ns, config)
 
     def is_subscription_mode(self) -> bool:
         """Check if running in subscription mode."""
@@ -173,7 +272,9 @@ class ConfigManager:
         config = self.load_config()
         provider = config.auth.provider
 
-        return config.models.models[provider][mode]  # type: ignore[no-any-return]
+        if config.models.models is _MODEL_TABLE:
+            return _MODEL_LOOKUP[(provider, mode)]
+        return config.models.models[provider][mode]
 
     def get_api_key(self, provider: str) -> Optional[str]:
         """Get API key for the configured provider."""
@@ -185,5 +286,14 @@ class ConfigManager:
         return None
 
 
-# Global configuration manager instance
-config_manager = ConfigManager()
+@functools.lru_cache(maxsize=1)
+def get_config_manager() -> ConfigManager:
+    """Get the shared configuration manager, creating it on first use."""
+    return ConfigManager()
+
+
+def __getattr__(name: str) -> Any:
+    # Deprecated: config_manager used to be created eagerly at import time
+    if name == "config_manager":
+        return get_config_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
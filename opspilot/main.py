@@ -13,16 +13,17 @@ from click_default_group import DefaultGroup
 
 from rich.console import Console
 
-from opspilot.tui.app import OpsPilot
-from opspilot.tui.config import LaunchConfig
-from opspilot.tui.database.import_chatgpt import import_chatgpt_data
-from opspilot.tui.database.database import create_database, sqlite_file_name
 from opspilot.tui.locations import config_file
 
+# The TUI, agent and database modules pull in Textual, litellm and
+# SQLAlchemy, so commands import them only when they need them
+
 console = Console()
 
 
 def create_db_if_not_exists() -> None:
+    from opspilot.tui.database.database import create_database, sqlite_file_name
+
     if not sqlite_file_name.exists():
         click.echo(f"Creating database at {sqlite_file_name!r}")
         asyncio.run(create_database())
@@ -50,6 +51,9 @@ def cli() -> None:
 
 def _launch_app(prompt: tuple[str, ...], model: str, inline: bool) -> None:
     """Common function to launch the OpsPilot TUI."""
+    from opspilot.tui.app import OpsPilot
+    from opspilot.tui.config import LaunchConfig
+
     prompt = prompt or ("",)
     joined_prompt = " ".join(prompt)
     create_db_if_not_exists()
@@ -118,6 +122,8 @@ def reset() -> None:
     from rich.padding import Padding
     from rich.text import Text
 
+    from opspilot.tui.database.database import create_database, sqlite_file_name
+
     console.print(
         Padding(
             Text.from_markup(
@@ -155,6 +161,8 @@ def import_file_to_db(file: pathlib.Path) -> None:
     This command will import the ChatGPT conversations from a local
     JSON file into the database.
     """
+    from opspilot.tui.database.import_chatgpt import import_chatgpt_data
+
     asyncio.run(import_chatgpt_data(file=file))
     console.print(f"[green]ChatGPT data imported from {str(file)!r}")
 
@@ -1,11 +1,31 @@
 """API Keys Management for OpsPilot TUI"""
 
 import json
+import os
 from pathlib import Path
-from typing import Dict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 from opspilot.tui.locations import config_directory
 
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to indented JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _loads: Callable[[Union[bytes, str]], Any] = orjson.loads
+except ImportError:
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize to indented JSON bytes."""
+        return json.dumps(obj, indent=2).encode()
+
+    _loads = json.loads
+
+# Keys as last read or written, with the file path and mtime they came from
+_keys_cache: Optional[Tuple[Path, int, Dict[str, str]]] = None
+
 
 def api_keys_file() -> Path:
     """Return the path to the API keys file."""
@@ -17,17 +37,28 @@ def load_api_keys() -> Dict[str, str]:
 
     Returns a dictionary mapping provider names to API keys.
     """
+    global _keys_cache
+
     keys_file = api_keys_file()
 
-    if not keys_file.exists():
+    try:
+        mtime_ns = keys_file.stat().st_mtime_ns
+    except OSError:
         return {}
 
+    if _keys_cache is not None:
+        cached_file, cached_mtime, cached_keys = _keys_cache
+        if cached_file == keys_file and cached_mtime == mtime_ns:
+            return dict(cached_keys)
+
     try:
-        with open(keys_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        keys = _loads(keys_file.read_bytes())
     except (json.JSONDecodeError, IOError):
         return {}
 
+    _keys_cache = (keys_file, mtime_ns, keys)
+    return dict(keys)
+
 
 def save_api_keys(api_keys: Dict[str, str]) -> None:
     """Save API keys to the config file.
@@ -35,6 +66,8 @@ def save_api_keys(api_keys: Dict[str, str]) -> None:
     Args:
         api_keys: Dictionary mapping provider names to API keys
     """
+    global _keys_cache
+
     keys_file = api_keys_file()
 
     # Ensure the directory exists
@@ -43,15 +76,31 @@ def save_api_keys(api_keys: Dict[str, str]) -> None:
     # Filter out empty keys
     filtered_keys = {k: v for k, v in api_keys.items() if v and v.strip()}
 
+    # Nothing to write if the file still holds exactly these keys
+    if _keys_cache is not None and _keys_cache[2] == filtered_keys:
+        try:
+            mtime_ns = keys_file.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if _keys_cache[:2] == (keys_file, mtime_ns):
+            return
+
+    # Write beside the real file and rename over it so a crash never leaves
+    # a truncated keys file; the temp file is owner-only from the start
+    tmp_file = keys_file.with_suffix(".json.tmp")
     try:
-        with open(keys_file, "w", encoding="utf-8") as f:
-            json.dump(filtered_keys, f, indent=2)
-
-        # Set restrictive permissions (readable/writable by owner only)
-        keys_file.chmod(0o600)
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        # The mode above only applies when the file is created
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dumps(filtered_keys))
+        os.replace(tmp_file, keys_file)
+        mtime_ns = keys_file.stat().st_mtime_ns
     except IOError as e:
         raise RuntimeError(f"Failed to save API keys: {e}")
 
+    _keys_cache = (keys_file, mtime_ns, filtered_keys)
+
 
 def update_api_key(provider: str, api_key: str) -> None:
     """Update a single API key for a provider.
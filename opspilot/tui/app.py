@@ -32,6 +32,8 @@ class OpsPilot(App[None]):
         Binding("q", "app.quit", "Quit", show=False),
         Binding("f1,?", "help", "Help"),
     ]
+    # Installed on first use and kept, so the help text is only parsed once
+    SCREENS = {"help": HelpScreen}
 
     # Use textual-dark as base theme, we'll override with custom theme colors
     DEFAULT_CSS = """
@@ -85,6 +87,12 @@ class OpsPilot(App[None]):
     async def on_mount(self) -> None:
         await self.push_screen(HomeScreen(self.runtime_config_signal))
         self.app_theme = self.launch_config.theme
+        # Import the LLM client while the user reads the home screen
+        self.run_worker(
+            self.agent.warmup(self.runtime_config.selected_model.name),
+            group="warmup",
+            exit_on_error=False,
+        )
         if self.startup_prompt:
             await self.launch_chat(
                 prompt=self.startup_prompt,
@@ -126,7 +134,7 @@ class OpsPilot(App[None]):
         if isinstance(self.screen, HelpScreen):
             self.pop_screen()
         else:
-            await self.push_screen(HelpScreen())
+            await self.push_screen("help")
 
     def action_open_link(self, url: str) -> None:
         """Open a URL in the default browser."""
@@ -161,6 +169,11 @@ class OpsPilot(App[None]):
 
     async def on_unmount(self) -> None:
         """Cleanup when app is closing."""
+        try:
+            await self.agent.aclose()
+        except Exception:
+            pass  # Ignore cleanup errors
+
         try:
             # Close LiteLLM async clients to avoid RuntimeWarning
             from litellm import close_litellm_async_clients
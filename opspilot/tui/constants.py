@@ -1 +1,8 @@
 ERROR_NOTIFY_TIMEOUT_SECS = 15
+
+# Streamed tokens arriving within this window are drawn in one repaint
+STREAM_REFRESH_INTERVAL_SECS = 0.05
+
+# Older messages are unmounted beyond this many so long chats stay responsive;
+# they remain in the chat history and database
+MAX_MOUNTED_CHATBOXES = 500
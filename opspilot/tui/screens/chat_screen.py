@@ -4,8 +4,6 @@ from textual.binding import Binding
 from textual.screen import Screen
 from textual.widgets import Footer
 
-from opspilot.tui.chats_manager import ChatsManager
-from opspilot.tui.widgets.agent_is_typing import ResponseStatus
 from opspilot.tui.widgets.chat import Chat
 from opspilot.tui.models import ChatData
 
@@ -28,32 +26,33 @@ class ChatScreen(Screen[None]):
     ):
         super().__init__()
         self.chat_data = chat_data
-        self.chats_manager = ChatsManager()
 
     def compose(self) -> ComposeResult:
-        yield Chat(self.chat_data)
+        self._chat = Chat(self.chat_data)
+        yield self._chat
         yield Footer()
 
     @on(Chat.NewUserMessage)
     def new_user_message(self, event: Chat.NewUserMessage) -> None:
         """Handle a new user message."""
-        self.query_one(Chat).allow_input_submit = False
-        response_status = self.query_one(ResponseStatus)
+        self._chat.allow_input_submit = False
+        response_status = self._chat.response_status
         response_status.set_awaiting_response()
         response_status.display = True
 
     @on(Chat.AgentResponseStarted)
     def start_awaiting_response(self) -> None:
         """Prevent sending messages because the agent is typing."""
-        response_status = self.query_one(ResponseStatus)
+        response_status = self._chat.response_status
         response_status.set_agent_responding()
         response_status.display = True
 
     @on(Chat.AgentResponseComplete)
     async def agent_response_complete(self, event: Chat.AgentResponseComplete) -> None:
         """Allow the user to send messages again."""
-        self.query_one(ResponseStatus).display = False
-        self.query_one(Chat).allow_input_submit = True
+        with self.app.batch_update():
+            self._chat.response_status.display = False
+            self._chat.allow_input_submit = True
         log.debug(
             f"Agent response complete. Adding message "
             f"to chat_id {event.chat_id!r}: {event.message}"
@@ -61,6 +60,4 @@ class ChatScreen(Screen[None]):
         if self.chat_data.id is None:
             raise RuntimeError("Chat has no ID. This is likely a bug in OpsPilot.")
 
-        await self.chats_manager.add_message_to_chat(
-            chat_id=self.chat_data.id, message=event.message
-        )
+        await self._chat.persist_message(event.message)
@@ -3,24 +3,34 @@ from textual.containers import Vertical
 from textual.reactive import Reactive, reactive
 from textual.widgets import LoadingIndicator, Label
 
+# Message and CSS class for each response state
+_AWAITING_RESPONSE = ("Awaiting response...", "-awaiting-response")
+_AGENT_RESPONDING = ("✨ Agent is thinking...", "-agent-responding")
+
 
 class ResponseStatus(Vertical):
     """
     A widget that displays the status of the response from the agent.
     """
 
-    message: Reactive[str] = reactive("Agent is thinking...", recompose=True)
+    message: Reactive[str] = reactive("Agent is thinking...", init=False)
 
     def compose(self) -> ComposeResult:
-        yield Label(f" {self.message}")
+        self._label = Label(f" {self.message}")
+        yield self._label
         yield LoadingIndicator()
 
+    def watch_message(self, message: str) -> None:
+        # Update the label in place rather than recomposing the widget
+        self._label.update(f" {message}")
+
     def set_awaiting_response(self) -> None:
-        self.message = "Awaiting response..."
-        self.add_class("-awaiting-response")
-        self.remove_class("-agent-responding")
+        self._set_state(_AWAITING_RESPONSE, _AGENT_RESPONDING)
 
     def set_agent_responding(self) -> None:
-        self.message = "✨ Agent is thinking..."
-        self.add_class("-agent-responding")
-        self.remove_class("-awaiting-response")
+        self._set_state(_AGENT_RESPONDING, _AWAITING_RESPONSE)
+
+    def _set_state(self, state: tuple[str, str], previous: tuple[str, str]) -> None:
+        self.message, css_class = state
+        self.add_class(css_class)
+        self.remove_class(previous[1])
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
+import time
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, cast
 
@@ -24,7 +26,6 @@ from opspilot.tui.widgets.chat_header import ChatHeader, TitleStatic
 from opspilot.tui.widgets.prompt_input import PromptInput
 from opspilot.tui.widgets.chatbox import Chatbox
 
-
 if TYPE_CHECKING:
     from opspilot.tui.app import OpsPilot
     from litellm.types.completion import (
@@ -66,6 +67,8 @@ class Chat(Widget):
         self.chat_data = chat_data
         self.opspilot = cast("OpsPilot", self.app)
         self.model = chat_data.model
+        # Saves run alongside the agent request, so keep them in send order
+        self._persist_lock = asyncio.Lock()
 
     @dataclass
     class AgentResponseStarted(Message):
@@ -89,13 +92,19 @@ class Chat(Widget):
         content: str
 
     def compose(self) -> ComposeResult:
-        yield ChatHeader(chat=self.chat_data, model=self.model)
+        # Keep the widgets we update on every message rather than querying
+        # the DOM for them each time
+        self._header = ChatHeader(chat=self.chat_data, model=self.model)
+        yield self._header
 
         with VerticalScroll(id="chat-container") as vertical_scroll:
             vertical_scroll.can_focus = False
+        self._chat_container = vertical_scroll
 
-        yield ResponseStatus()
-        yield ChatPromptInput(id="prompt")
+        self._response_status = ResponseStatus()
+        yield self._response_status
+        self._prompt = ChatPromptInput(id="prompt")
+        yield self._prompt
 
     async def on_mount(self, _: events.Mount) -> None:
         """
@@ -105,7 +114,11 @@ class Chat(Widget):
 
     @property
     def chat_container(self) -> VerticalScroll:
-        return self.query_one("#chat-container", VerticalScroll)
+        return self._chat_container
+
+    @property
+    def response_status(self) -> ResponseStatus:
+        return self._response_status
 
     @property
     def is_empty(self) -> bool:
@@ -120,12 +133,11 @@ class Chat(Widget):
     @on(AgentResponseFailed)
     def restore_state_on_agent_failure(self, event: Chat.AgentResponseFailed) -> None:
         # Hide thinking animation
-        status = self.query_one(ResponseStatus)
-        status.styles.display = "none"
+        self._response_status.styles.display = "none"
 
         original_prompt = event.last_message.message.get("content", "")
         if isinstance(original_prompt, str):
-            self.query_one(ChatPromptInput).text = original_prompt
+            self._prompt.text = original_prompt
 
     async def new_user_message(self, content: str) -> None:
         log.debug(f"User message submitted in chat {self.chat_data.id!r}: {content!r}")
@@ -145,49 +157,38 @@ class Chat(Widget):
         ), "Textual has mounted container at this point in the lifecycle."
 
         await self.chat_container.mount(user_message_chatbox)
+        await self.evict_old_chatboxes()
 
         self.scroll_to_latest_message()
         self.post_message(self.NewUserMessage(content))
 
-        await ChatsManager.add_message_to_chat(
-            chat_id=self.chat_data.id, message=user_chat_message
-        )
-
-        prompt = self.query_one(ChatPromptInput)
-        prompt.submit_ready = False
+        self._prompt.submit_ready = False
+        # Start the request first; saving the message overlaps with it
         self.stream_agent_response()
+        await self.persist_message(user_chat_message)
+
+    async def persist_message(self, message: ChatMessage) -> None:
+        """Save a message to this chat's history in the database."""
+        # Taking a free lock doesn't yield, so callers keep their call order
+        async with self._persist_lock:
+            await ChatsManager.add_message_to_chat(
+                chat_id=self.chat_data.id, message=message
+            )
 
-    @work(thread=True, group="agent_response")
+    @work(group="agent_response")
     async def stream_agent_response(self) -> None:
+        # Runs on the app's event loop, so the agent's pooled HTTP client is
+        # reused from one reply to the next
         model = self.chat_data.model
         log.debug(f"Creating streaming response with model {model.name!r}")
 
-        # Show thinking animation (must be done in main thread)
-        def show_thinking():
-            status = self.query_one(ResponseStatus)
-            status.set_agent_responding()
-            status.styles.display = "block"
-
-        self.app.call_from_thread(show_thinking)
-
-        try:
-            response = await self.opspilot.agent.process(
-                self.chat_data.messages[-1].message["content"], selected_model=model
-            )
-        except Exception as exception:
-            # Notify must be done in main thread
-            self.app.call_from_thread(
-                self.app.notify,
-                f"{exception}",
-                title="Error",
-                severity="error",
-                timeout=constants.ERROR_NOTIFY_TIMEOUT_SECS,
-            )
-            self.post_message(self.AgentResponseFailed(self.chat_data.messages[-1]))
-            return
+        # Show thinking animation
+        status = self._response_status
+        status.set_agent_responding()
+        status.styles.display = "block"
 
         ai_message: ChatCompletionAssistantMessageParam = {
-            "content": response,
+            "content": "",
             "role": "assistant",
         }
         now = datetime.datetime.now(datetime.timezone.utc)
@@ -198,13 +199,67 @@ class Chat(Widget):
             model=self.chat_data.model,
             classes="response-in-progress",
         )
-        self.post_message(self.AgentResponseStarted())
-        self.app.call_from_thread(self.chat_container.mount, response_chatbox)
 
         assert (
             self.chat_container is not None
         ), "Textual has mounted container at this point in the lifecycle."
 
+        started = False
+
+        def start_response() -> None:
+            nonlocal started
+            started = True
+            self.post_message(self.AgentResponseStarted())
+            self.chat_container.mount(response_chatbox)
+
+        # Render tokens as they arrive rather than after the full reply, but
+        # coalesce bursts so each repaint covers several tokens. Anything
+        # still pending is covered by the final reply below.
+        pending: list[str] = []
+        last_flush = 0.0
+        # With no terminal to paint (e.g. tests or CI), only the final reply
+        # is worth rendering
+        stream_tokens = not self.app.is_headless
+
+        def on_token(token: str) -> None:
+            nonlocal last_flush
+            if not started:
+                start_response()
+            if not stream_tokens:
+                return
+            pending.append(token)
+            now = time.monotonic()
+            if now - last_flush >= constants.STREAM_REFRESH_INTERVAL_SECS:
+                chunk = "".join(pending)
+                pending.clear()
+                last_flush = now
+                response_chatbox.append_chunk(chunk)
+
+        try:
+            response = await self.opspilot.agent.process(
+                self.chat_data.messages[-1].message["content"],
+                selected_model=model,
+                on_token=on_token,
+            )
+        except Exception as exception:
+            if started:
+                response_chatbox.remove()
+            self.app.notify(
+                f"{exception}",
+                title="Error",
+                severity="error",
+                timeout=constants.ERROR_NOTIFY_TIMEOUT_SECS,
+            )
+            self.post_message(self.AgentResponseFailed(self.chat_data.messages[-1]))
+            return
+
+        if not started:
+            start_response()
+
+        # The final reply is authoritative, e.g. after a tool-call round trip
+        response_chatbox.message.message["content"] = response
+        response_chatbox.refresh(layout=True)
+
         self.post_message(
             self.AgentResponseComplete(
                 chat_id=self.chat_data.id,
@@ -227,28 +282,28 @@ class Chat(Widget):
                 await awaiting_reply.remove()
 
     @on(AgentResponseComplete)
-    def agent_finished_responding(self, event: AgentResponseComplete) -> None:
-        # Hide thinking animation
-        status = self.query_one(ResponseStatus)
-        status.styles.display = "none"
-
-        # Ensure the thread is updated with the message from the agent
-        self.chat_data.messages.append(event.message)
-        event.chatbox.border_title = "Agent"
-        event.chatbox.remove_class("response-in-progress")
-        prompt = self.query_one(ChatPromptInput)
-        prompt.submit_ready = True
-
-        # Update usage statistics in header
-        usage_stats = self.opspilot.agent.get_usage_stats()
-        header = self.query_one(ChatHeader)
-        header.update_usage_stats(
-            total_tokens=usage_stats["total_tokens"],
-            context_tokens=usage_stats["current_context_tokens"],
-            total_cost=usage_stats["total_cost"],
-        )
+    async def agent_finished_responding(self, event: AgentResponseComplete) -> None:
+        # Apply the end-of-reply updates in a single repaint
+        with self.app.batch_update():
+            # Hide thinking animation
+            self._response_status.styles.display = "none"
+
+            # Ensure the thread is updated with the message from the agent
+            self.chat_data.messages.append(event.message)
+            event.chatbox.border_title = "Agent"
+            event.chatbox.remove_class("response-in-progress")
+            self._prompt.submit_ready = True
+
+            # Update usage statistics in header
+            usage_stats = self.opspilot.agent.get_usage_stats()
+            self._header.update_usage_stats(
+                total_tokens=usage_stats["total_tokens"],
+                context_tokens=usage_stats["current_context_tokens"],
+                total_cost=usage_stats["total_cost"],
+            )
 
         # Auto-scroll to show the latest message
+        await self.evict_old_chatboxes()
         self.scroll_to_latest_message()
 
     @on(PromptInput.PromptSubmitted)
@@ -267,16 +322,22 @@ class Chat(Widget):
 
     @on(Chatbox.CursorEscapingBottom)
     def move_focus_to_prompt(self) -> None:
-        self.query_one(ChatPromptInput).focus()
+        self._prompt.focus()
 
     @on(TitleStatic.ChatRenamed)
     async def handle_chat_rename(self, event: TitleStatic.ChatRenamed) -> None:
         if event.chat_id == self.chat_data.id and event.new_title:
             self.chat_data.title = event.new_title
-            header = self.query_one(ChatHeader)
-            header.update_header(self.chat_data, self.model)
+            self._header.update_header(self.chat_data, self.model)
             await ChatsManager.rename_chat(event.chat_id, event.new_title)
 
+    async def evict_old_chatboxes(self) -> None:
+        """Unmount the oldest messages beyond MAX_MOUNTED_CHATBOXES."""
+        children = self.chat_container.children
+        excess = len(children) - constants.MAX_MOUNTED_CHATBOXES
+        if excess > 0:
+            await self.chat_container.remove_children(children[:excess])
+
     def get_latest_chatbox(self) -> Chatbox:
         return self.query(Chatbox).last()
 
@@ -313,11 +374,13 @@ class Chat(Widget):
     async def load_chat(self, chat_data: ChatData) -> None:
         chatboxes = [
             Chatbox(chat_message, chat_data.model)
-            for chat_message in chat_data.non_system_messages
+            for chat_message in chat_data.non_system_messages[
+                -constants.MAX_MOUNTED_CHATBOXES :
+            ]
         ]
         await self.chat_container.mount_all(chatboxes)
         self.chat_container.scroll_end(animate=False, force=True)
-        chat_header = self.query_one(ChatHeader)
+        chat_header = self._header
         chat_header.update_header(
             chat=chat_data,
             model=chat_data.model,
@@ -334,8 +397,7 @@ class Chat(Widget):
         # If the last message didn't receive a response, try again.
         messages = chat_data.messages
         if messages and messages[-1].message["role"] == "user":
-            prompt = self.query_one(ChatPromptInput)
-            prompt.submit_ready = False
+            self._prompt.submit_ready = False
             self.stream_agent_response()
 
     def action_close(self) -> None:
@@ -86,12 +86,18 @@ class ChatHeader(Widget):
         self, total_tokens: int, context_tokens: int, total_cost: float
     ):
         """Update usage statistics display."""
+        if (total_tokens, context_tokens, total_cost) == (
+            self.total_tokens,
+            self.context_tokens,
+            self.total_cost,
+        ):
+            # Nothing changed, e.g. a cached reply; skip the re-render
+            return
+
         self.total_tokens = total_tokens
         self.context_tokens = context_tokens
         self.total_cost = total_cost
-
-        stats_static = self.query_one("#stats-static", Static)
-        stats_static.update(self.stats_static_content())
+        self._stats_static.update(self.stats_static_content())
 
     def title_static_content(self) -> str:
         chat = self.chat
@@ -116,4 +122,5 @@ class ChatHeader(Widget):
     def compose(self) -> ComposeResult:
         yield TitleStatic(self.chat.id, self.title_static_content(), id="title-static")
         yield Static(self.model_static_content(), id="model-static")
-        yield Static(self.stats_static_content(), id="stats-static")
+        self._stats_static = Static(self.stats_static_content(), id="stats-static")
+        yield self._stats_static
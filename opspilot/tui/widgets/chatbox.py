@@ -1,5 +1,6 @@
 from __future__ import annotations
 import bisect
+import functools
 from dataclasses import dataclass
 
 from rich.console import RenderableType
@@ -18,6 +19,22 @@ from textual.document._syntax_aware_document import SyntaxAwareDocumentError
 from opspilot.tui.config import OpsPilotChatModel
 from opspilot.tui.models import ChatMessage
 
+# CSS class and border title for each message role; other roles are the user
+_ROLE_STYLES: dict[str, tuple[str, str]] = {
+    "assistant": ("assistant-message", "Agent"),
+}
+_DEFAULT_ROLE_STYLE = ("human-message", "You")
+
+
+# Role, content, background color and code theme of a rendered message
+_RenderKey = tuple[str, str, str, str]
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_markdown(content: str, code_theme: str) -> Markdown:
+    """Parse message content, sharing the result between identical messages."""
+    return Markdown(content, code_theme=code_theme)
+
 
 class SelectionTextArea(TextArea):
     class LeaveSelectionMode(Message):
@@ -254,16 +271,14 @@ class Chatbox(Widget, can_focus=True):
         )
         self.message = message
         self.model = model
+        # The last renderable built and what it was built from, so repaints
+        # don't re-parse unchanged content
+        self._render_cache: tuple[_RenderKey, RenderableType] | None = None
 
     def on_mount(self) -> None:
-        litellm_message = self.message.message
-        role = litellm_message["role"]
-        if role == "assistant":
-            self.add_class("assistant-message")
-            self.border_title = "Agent"
-        else:
-            self.add_class("human-message")
-            self.border_title = "You"
+        role = self.message.message["role"]
+        css_class, self.border_title = _ROLE_STYLES.get(role, _DEFAULT_ROLE_STYLE)
+        self.add_class(css_class)
 
     def action_up(self) -> None:
         self.screen.focus_previous(Chatbox)
@@ -358,7 +373,11 @@ class Chatbox(Widget, can_focus=True):
         if not isinstance(content, str):
             content = ""
 
-        return Markdown(content, code_theme=self.app.launch_config.message_code_theme)
+        code_theme = self.app.launch_config.message_code_theme
+        if self.has_class("response-in-progress"):
+            # Partial replies change with every chunk; don't fill the cache
+            return Markdown(content, code_theme=code_theme)
+        return _parse_markdown(content, code_theme)
 
     def render(self) -> RenderableType:
         if self.selection_mode:
@@ -373,18 +392,29 @@ class Chatbox(Widget, can_focus=True):
         else:
             background_color = "#121212"
 
-        if message["role"] == "user":
-            content = message["content"] or ""
-            if isinstance(content, str):
-                return Syntax(
-                    content,
-                    lexer="markdown",
-                    word_wrap=True,
-                    background_color=background_color,
-                )
-            else:
+        content = message.get("content")
+        if not isinstance(content, str):
+            if message["role"] == "user":
                 return ""
-        return self.markdown
+            content = ""
+        # The code theme shapes the markdown, so switching it must re-render
+        code_theme = self.app.launch_config.message_code_theme
+        cache_key = (message["role"], content, background_color, code_theme)
+        if self._render_cache is not None and self._render_cache[0] == cache_key:
+            return self._render_cache[1]
+
+        renderable: RenderableType
+        if message["role"] == "user":
+            renderable = Syntax(
+                content,
+                lexer="markdown",
+                word_wrap=True,
+                background_color=background_color,
+            )
+        else:
+            renderable = self.markdown
+        self._render_cache = (cache_key, renderable)
+        return renderable
 
     def append_chunk(self, chunk: str) -> None:
         """Append a chunk of text to the end of the message."""
@@ -2,7 +2,8 @@
 no chat history.
 """
 
-from rich.console import RenderableType
+from typing import Any
+
 from textual.widgets import Static
 
 
@@ -24,8 +25,9 @@ Finally, please consider starring the repo and sharing it with your friends and
 
     BORDER_TITLE = "Welcome to OpsPilot!"
 
-    def render(self) -> RenderableType:
-        return self.MESSAGE
+    def __init__(self, **kwargs: Any) -> None:
+        # Static parses the markup once, rather than on every render
+        super().__init__(self.MESSAGE, **kwargs)
 
     def _action_open_repo(self) -> None:
         import webbrowser
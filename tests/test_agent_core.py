@@ -2,8 +2,18 @@
 Tests for OpsPilot Agent Core
 """
 
+import asyncio
+import dataclasses
+import json
+import threading
+from types import SimpleNamespace
+
 import pytest
-from opspilot.agent.core import AgentCore, AgentMode, Tool
+from opspilot.agent import _fallbacks, core
+from opspilot.agent.core import AgentCore, AgentMode, Tool, get_agent_core
+from opspilot.agent.response_cache import ResponseCache
+from opspilot.agent.tools import get_file_tools
+from opspilot.agent.tools.files import FileTool
 
 
 def test_agent_initialization():
@@ -27,6 +37,21 @@ def test_mode_switching():
     assert agent.mode == AgentMode.PLAN
 
 
+def test_model_resolved_once_per_mode(monkeypatch):
+    """Test that switching modes reuses each mode's resolved model."""
+    calls = []
+    manager = core.get_config_manager()
+    monkeypatch.setattr(
+        manager, "get_model_for_mode", lambda mode: calls.append(mode) or mode
+    )
+    agent = AgentCore()
+
+    for mode in (AgentMode.PLAN, AgentMode.BUILD, AgentMode.PLAN, AgentMode.BUILD):
+        agent.switch_mode(mode)
+        assert agent._get_current_model() == mode.value
+    assert calls == ["plan", "build"]
+
+
 def test_add_message():
     """Test adding messages to conversation history."""
     agent = AgentCore()
@@ -52,6 +77,56 @@ def test_clear_history():
     assert len(agent.messages) == 0
 
 
+def test_history_truncated_to_budget(monkeypatch):
+    """Test that the oldest history is dropped to fit the token budget."""
+    monkeypatch.setattr(core, "estimate_tokens", lambda content: len(content) // 4)
+    agent = AgentCore()
+
+    for i in range(10):
+        agent.add_message("user", f"{i}" * 400)  # ~100 tokens each
+
+    agent._truncate_to_budget(max_tokens=300)
+
+    assert len(agent._api_messages) == 3
+    assert agent._api_messages[0]["content"].startswith("7")
+    # Full history is kept for introspection
+    assert len(agent.messages) == 10
+
+
+def test_api_messages_keep_tool_call_fields(monkeypatch):
+    """Test that tool calls and results keep their linking fields."""
+    monkeypatch.setattr(core, "estimate_tokens", lambda content: len(content) // 4)
+    agent = AgentCore()
+    tool_calls = [{"id": "call_1", "function": {"name": "read", "arguments": "{}"}}]
+
+    agent.add_message("user", "x" * 4000)
+    agent.add_message("assistant", "y" * 400, tool_calls)
+    agent.add_message("tool", "result", tool_call_id="call_1")
+    agent.add_message("user", "next")
+
+    assert agent._api_messages[1]["tool_calls"] == tool_calls
+    assert agent._api_messages[2]["tool_call_id"] == "call_1"
+    assert "tool_calls" not in agent._api_messages[0]
+
+    # Dropping the assistant turn also drops its orphaned tool result
+    agent._truncate_to_budget(max_tokens=50)
+    assert list(agent._api_messages) == [{"role": "user", "content": "next"}]
+
+
+def test_history_truncated_to_turn_window():
+    """Test that only the most recent turns are kept."""
+    agent = AgentCore()
+
+    for i in range(30):
+        agent.add_message("user", f"question {i}")
+        agent.add_message("assistant", f"answer {i}")
+
+    agent._truncate_to_budget(max_turns=5)
+
+    assert len(agent._api_messages) == 10
+    assert agent._api_messages[0]["content"] == "question 25"
+
+
 def test_tool_registration():
     """Test registering tools with the agent."""
     agent = AgentCore()
@@ -149,6 +224,416 @@ def test_get_available_tools_build_mode():
     assert "build_tool" in tool_names
 
 
+def test_available_tools_cache_invalidated_on_register():
+    """Test that registering a tool refreshes the cached tool list."""
+    agent = AgentCore()
+
+    async def first_tool(**kwargs):
+        return "First"
+
+    async def second_tool(**kwargs):
+        return "Second"
+
+    agent.register_tool(
+        Tool(
+            name="first_tool",
+            description="First tool",
+            parameters={"type": "object"},
+            function=first_tool,
+        )
+    )
+    assert agent.get_available_tools() is agent.get_available_tools()
+    assert len(agent.get_available_tools()) == 1
+
+    agent.register_tool(
+        Tool(
+            name="second_tool",
+            description="Second tool",
+            parameters={"type": "object"},
+            function=second_tool,
+        )
+    )
+    tool_names = [t["function"]["name"] for t in agent.get_available_tools()]
+    assert tool_names == ["first_tool", "second_tool"]
+
+
+async def test_act_runs_tools_concurrently():
+    """Test that parallel-safe tool calls run concurrently in call order."""
+    agent = AgentCore()
+    ready = asyncio.Event()
+    order = []
+
+    async def waiter(**kwargs):
+        await asyncio.wait_for(ready.wait(), timeout=1)
+        return "waited"
+
+    async def setter(**kwargs):
+        ready.set()
+        return "set"
+
+    async def failing(**kwargs):
+        order.append("failing")
+        raise RuntimeError("boom")
+
+    async def reader(**kwargs):
+        order.append("reader")
+        return "read"
+
+    for name, func, safe in [
+        ("waiter", waiter, True),
+        ("setter", setter, True),
+        ("failing", failing, False),
+        ("reader", reader, True),
+    ]:
+        agent.register_tool(
+            Tool(
+                name=name,
+                description=name,
+                parameters={"type": "object"},
+                function=func,
+                parallel_safe=safe,
+            )
+        )
+
+    tool_calls = [
+        {"id": str(i), "function": {"name": name, "arguments": "{}"}}
+        for i, name in enumerate(["waiter", "setter", "failing", "reader"])
+    ]
+    results = await agent.act(tool_calls)
+
+    assert [r["result"] for r in results] == [
+        "waited",
+        "set",
+        "Tool Error: boom",
+        "read",
+    ]
+    assert [m.tool_call_id for m in agent.messages] == ["0", "1", "2", "3"]
+    # A parallel-safe call never overtakes an earlier serial one
+    assert order == ["failing", "reader"]
+
+
+def test_tools_run_serially_by_default():
+    """Test that tools must opt in to running concurrently."""
+    agent = AgentCore()
+    agent.register_tool(
+        Tool(
+            name="writer",
+            description="writer",
+            parameters={"type": "object"},
+            function=lambda **kwargs: None,
+            requires_build_mode=True,
+        )
+    )
+
+    assert agent._is_parallel_safe("writer") is False
+    assert agent._is_parallel_safe("missing") is False
+
+
+async def test_act_runs_file_reads_concurrently(tmp_path):
+    """Test that registered file reads overlap but wait for earlier writes."""
+    agent = AgentCore()
+    file_tool = FileTool(base_path=str(tmp_path))
+    for tool in get_file_tools(file_tool):
+        agent.register_tool(tool)
+    (tmp_path / "a.txt").write_text("old")
+    (tmp_path / "b.txt").write_text("b")
+
+    # The first two reads block until both are in their threads at once
+    barrier = threading.Barrier(2, timeout=1)
+    read_sync = file_tool._read_file_sync
+    reads = []
+
+    def read_together(*args):
+        reads.append(args[0])
+        if len(reads) <= 2:
+            barrier.wait()
+        return read_sync(*args)
+
+    file_tool._read_file_sync = read_together
+
+    calls = [
+        ("read_file", {"file_path": "a.txt"}),
+        ("read_file", {"file_path": "b.txt"}),
+        ("write_file", {"file_path": "a.txt", "content": "new", "backup": False}),
+        ("read_file", {"file_path": "a.txt"}),
+    ]
+    tool_calls = [
+        {"id": str(i), "function": {"name": name, "arguments": json.dumps(args)}}
+        for i, (name, args) in enumerate(calls)
+    ]
+    results = await agent.act(tool_calls)
+
+    assert len(reads) == 3
+    assert "'content': 'old'" in results[0]["result"]
+    assert "'content': 'b'" in results[1]["result"]
+    assert "'success': True" in results[2]["result"]
+    assert "'content': 'new'" in results[3]["result"]
+
+
+async def test_act_reports_malformed_arguments():
+    """Test that bad tool arguments fail only their own call."""
+    agent = AgentCore()
+
+    async def echo(**kwargs):
+        return kwargs["text"]
+
+    agent.register_tool(
+        Tool(
+            name="echo",
+            description="Echo text",
+            parameters={"type": "object"},
+            function=echo,
+        )
+    )
+
+    async def ping(**kwargs):
+        return "pong"
+
+    agent.register_tool(
+        Tool(
+            name="ping",
+            description="Ping",
+            parameters={"type": "object"},
+            function=ping,
+        )
+    )
+
+    results = await agent.act(
+        [
+            {"id": "1", "function": {"name": "echo", "arguments": "{not json"}},
+            {"id": "2", "function": {"name": "echo", "arguments": '{"text": "hi"}'}},
+            {"id": "3", "function": {"name": "ping", "arguments": ""}},
+        ]
+    )
+
+    assert results[0]["result"].startswith("Tool Error:")
+    assert results[1]["result"] == "hi"
+    assert results[2]["result"] == "pong"
+
+
+async def test_think_streams_tokens(monkeypatch):
+    """Test that streamed content deltas reach on_token."""
+    monkeypatch.setattr(core, "_acompletion", _fallbacks.mock_acompletion)
+    monkeypatch.setattr(
+        core, "_stream_chunk_builder", _fallbacks.mock_stream_chunk_builder
+    )
+    agent = AgentCore()
+    tokens = []
+
+    response = await agent.think("hello", on_token=tokens.append)
+
+    assert tokens
+    assert "".join(tokens) == response
+    assert agent.messages[-1].content == response
+
+
+async def test_stream_uses_provider_usage(monkeypatch):
+    """Test that streamed replies are billed from the provider's usage chunk."""
+    requests = []
+    usage = SimpleNamespace(prompt_tokens=7, completion_tokens=3, total_tokens=10)
+
+    async def stream():
+        delta = SimpleNamespace(content="hi", tool_calls=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+    async def acompletion(**kwargs):
+        requests.append(kwargs)
+        return stream()
+
+    def builder(chunks, messages=None):
+        message = SimpleNamespace(content="hi", tool_calls=None)
+        estimate = SimpleNamespace(
+            prompt_tokens=99, completion_tokens=99, total_tokens=198
+        )
+        return SimpleNamespace(
+            model="test-model",
+            choices=[SimpleNamespace(message=message)],
+            usage=estimate,
+        )
+
+    monkeypatch.setattr(core, "_acompletion", acompletion)
+    monkeypatch.setattr(core, "_stream_chunk_builder", builder)
+    monkeypatch.setitem(core._COST_TABLE, "test-model", (0.0, 0.0))
+    agent = AgentCore()
+
+    await agent.think("hello", on_token=lambda token: None)
+
+    assert requests[0]["stream_options"] == {"include_usage": True}
+    assert agent.usage_stats["total_tokens"] == 10
+    assert agent.usage_stats["current_context_tokens"] == 7
+
+
+async def test_think_keeps_blocking_work_off_the_loop(monkeypatch, tmp_path):
+    """Test that store writes and usage pricing run in worker threads."""
+    import threading
+
+    from opspilot.agent.store import ConversationStore
+
+    loop_thread = threading.get_ident()
+    threads = []
+
+    class RecordingStore(ConversationStore):
+        def append(self, *args, **kwargs):
+            threads.append(threading.get_ident())
+            super().append(*args, **kwargs)
+
+        def save_usage(self, stats):
+            threads.append(threading.get_ident())
+            super().save_usage(stats)
+
+    usage = SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+
+    async def acompletion(**kwargs):
+        message = SimpleNamespace(content="hi", tool_calls=None)
+        return SimpleNamespace(
+            model="test-model", choices=[SimpleNamespace(message=message)], usage=usage
+        )
+
+    monkeypatch.setattr(core, "_acompletion", acompletion)
+    monkeypatch.setitem(core._COST_TABLE, "test-model", (0.0, 0.0))
+    store = RecordingStore(str(tmp_path / "agent.db"))
+    agent = AgentCore(store=store)
+
+    assert await agent.think("hello") == "hi"
+
+    assert len(threads) == 3
+    assert loop_thread not in threads
+    store.close()
+
+
+async def test_fuzzy_cache_hits_plan_mode_only(monkeypatch):
+    """Test that near-duplicate prompts are only matched in PLAN mode."""
+    monkeypatch.setattr(core, "_acompletion", _fallbacks.mock_acompletion)
+    agent = AgentCore()
+    agent.response_cache = ResponseCache()
+    lookups = []
+    monkeypatch.setattr(
+        agent.response_cache,
+        "find_similar",
+        lambda scope, prompt: lookups.append(prompt),
+    )
+
+    await agent.think("list the pods")
+    agent.switch_mode(AgentMode.BUILD)
+    await agent.think("delete the pods")
+
+    assert lookups == ["list the pods"]
+
+
+async def test_http_client_reused_within_loop():
+    """Test that completions on one event loop share a pooled HTTP client."""
+    agent = AgentCore()
+
+    client = await agent._get_http_client()
+    assert await agent._get_http_client() is client
+
+    await agent.aclose()
+    assert client.closed
+    assert agent._http_client is None
+
+
+def test_http_client_closed_when_loop_changes():
+    """Test that a client left on a finished loop is closed when replaced."""
+    agent = AgentCore()
+
+    first = asyncio.run(agent._get_http_client())
+    second = asyncio.run(agent._get_http_client())
+
+    assert second is not first
+    assert first.closed
+    asyncio.run(agent.aclose())
+
+
+def test_http_client_closed_without_abort_ssl():
+    """Test that connectors predating abort_ssl are still closed."""
+    agent = AgentCore()
+
+    first = asyncio.run(agent._get_http_client())
+    connector = first.connector
+    close = connector.close
+    # Older aiohttp releases take no arguments
+    connector.close = lambda: close()
+    asyncio.run(agent._get_http_client())
+
+    assert connector.closed
+    asyncio.run(agent.aclose())
+
+
+async def test_http_session_passed_per_request(monkeypatch):
+    """Test that the pooled session goes with the request, not a global."""
+    requests = []
+
+    async def acompletion(model, messages, shared_session=None, **kwargs):
+        requests.append(shared_session)
+        return _fallbacks.MockResponse()
+
+    monkeypatch.setattr(core, "_acompletion", acompletion)
+    agent = AgentCore()
+
+    await agent.think("hello")
+    await agent.think("again")
+
+    assert requests[0] is not None
+    assert requests[0] is requests[1]
+    await agent.aclose()
+
+
+async def test_uninspectable_acompletion_gets_no_session(monkeypatch):
+    """Test that an acompletion without a readable signature still runs."""
+    requests = []
+
+    class Opaque:
+        # inspect.signature raises TypeError for this
+        __signature__ = "opaque"
+
+        async def __call__(self, **kwargs):
+            requests.append(kwargs)
+            return _fallbacks.MockResponse()
+
+    monkeypatch.setattr(core, "_acompletion", Opaque())
+    agent = AgentCore()
+
+    response = await agent.think("hello")
+
+    assert not str(response).startswith("AI Error")
+    assert "shared_session" not in requests[0]
+
+
+def test_message_is_immutable():
+    """Test that history messages are slotted and frozen."""
+    agent = AgentCore()
+    agent.add_message("user", "Hello")
+    message = agent.messages[0]
+
+    assert not hasattr(message, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        message.content = "changed"
+
+
+def test_get_agent_core_is_lazy_singleton():
+    """Test that the shared agent is created once and aliased as agent_core."""
+    assert get_agent_core() is get_agent_core()
+    assert core.agent_core is get_agent_core()
+
+
+async def test_track_usage(monkeypatch):
+    """Test usage tracking from a response's token counts."""
+    monkeypatch.setitem(core._COST_TABLE, "test-model", (0.001, 0.002))
+    agent = AgentCore()
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=50, total_tokens=150)
+
+    await agent._track_usage(SimpleNamespace(model="test-model", usage=usage))
+    # Responses without usage are ignored
+    await agent._track_usage(_fallbacks.MockResponse())
+
+    stats = agent.get_usage_stats()
+    assert stats["total_tokens"] == 150
+    assert stats["requests_count"] == 1
+    assert stats["current_context_tokens"] == 100
+    assert stats["total_cost"] == pytest.approx(0.2)
+
+
 def test_usage_stats():
     """Test usage statistics tracking."""
     agent = AgentCore()
@@ -158,9 +643,15 @@ def test_usage_stats():
     assert "total_cost" in stats
     assert "requests_count" in stats
 
+    # The view is read-only and tracks later updates
+    with pytest.raises(TypeError):
+        stats["total_tokens"] = 1
+    agent.usage_stats["total_tokens"] = 42
+    assert stats["total_tokens"] == 42
+
     # Reset stats
     agent.reset_usage_stats()
-    stats = agent.get_usage_stats()
+    assert agent.get_usage_stats() is stats
     assert stats["total_tokens"] == 0
     assert stats["total_cost"] == 0.0
 
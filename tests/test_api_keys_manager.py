@@ -0,0 +1,74 @@
+"""
+Tests for OpsPilot API key storage
+"""
+
+import os
+import stat
+
+import pytest
+from opspilot.tui import api_keys_manager
+
+
+@pytest.fixture
+def keys_file(tmp_path, monkeypatch):
+    """Point the API keys file at a temporary directory."""
+    path = tmp_path / "api_keys.json"
+    monkeypatch.setattr(api_keys_manager, "api_keys_file", lambda: path)
+    monkeypatch.setattr(api_keys_manager, "_keys_cache", None)
+    return path
+
+
+def test_save_and_load(keys_file):
+    """Test that keys round-trip through an owner-only file."""
+    assert api_keys_manager.load_api_keys() == {}
+
+    api_keys_manager.save_api_keys({"OpenAI": "sk-1", "Anthropic": " "})
+    assert api_keys_manager.load_api_keys() == {"OpenAI": "sk-1"}
+    assert stat.S_IMODE(keys_file.stat().st_mode) == 0o600
+    assert not keys_file.with_suffix(".json.tmp").exists()
+
+
+def test_update_api_key(keys_file):
+    """Test adding and removing a single provider's key."""
+    api_keys_manager.update_api_key("OpenAI", "sk-1")
+    api_keys_manager.update_api_key("Anthropic", "sk-2")
+    api_keys_manager.update_api_key("OpenAI", "")
+
+    assert api_keys_manager.load_api_keys() == {"Anthropic": "sk-2"}
+
+
+def test_load_returns_copy(keys_file):
+    """Test that mutating loaded keys does not touch the cache."""
+    api_keys_manager.save_api_keys({"OpenAI": "sk-1"})
+
+    keys = api_keys_manager.load_api_keys()
+    keys["OpenAI"] = "changed"
+    assert api_keys_manager.load_api_keys() == {"OpenAI": "sk-1"}
+
+
+def test_save_unchanged_keys_skips_write(keys_file):
+    """Test that saving the keys already on disk leaves the file alone."""
+    api_keys_manager.save_api_keys({"OpenAI": "sk-1"})
+    os.utime(keys_file, ns=(0, 0))
+    api_keys_manager.load_api_keys()
+
+    api_keys_manager.update_api_key("OpenAI", "sk-1")
+    assert keys_file.stat().st_mtime_ns == 0
+
+    api_keys_manager.update_api_key("OpenAI", "sk-2")
+    assert keys_file.stat().st_mtime_ns != 0
+
+
+def test_load_picks_up_external_edit(keys_file):
+    """Test that a file changed behind the cache is read again."""
+    api_keys_manager.save_api_keys({"OpenAI": "sk-1"})
+    mtime_ns = keys_file.stat().st_mtime_ns
+    keys_file.write_text('{"OpenAI": "sk-2", "Groq": "gsk"}')
+    # Coarse filesystem timestamps may not tick between the two writes
+    os.utime(keys_file, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+    assert api_keys_manager.load_api_keys() == {"OpenAI": "sk-2", "Groq": "gsk"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -2,8 +2,20 @@
 Basic tests for OpsPilot configuration.
 """
 
+import json
+import logging
+import os
+from pathlib import Path
+
 import pytest
-from opspilot.config import AuthConfig, ModelConfig, AppConfig, ConfigManager
+import opspilot
+from opspilot.config import (
+    AuthConfig,
+    ModelConfig,
+    AppConfig,
+    ConfigManager,
+    _config_from_dict,
+)
 
 
 def test_auth_config():
@@ -21,6 +33,26 @@ def test_model_config():
     assert "anthropic" in models.models
     assert models.models["zhipu"]["plan"] == "openrouter/z-ai/glm-4.6"
     assert models.models["zhipu"]["build"] == "openrouter/z-ai/glm-4.6"
+    assert ModelConfig().models is models.models
+
+
+def test_model_table_not_persisted(tmp_path):
+    """Test that the built-in model table is not written to the config file."""
+    manager = ConfigManager()
+    manager.config_dir = tmp_path
+    manager.config_file = tmp_path / "config.json"
+
+    manager.save_config(AppConfig())
+    assert "models" not in json.loads(manager.config_file.read_text())
+
+    # Tables saved by older releases are ignored in favour of the built-in one
+    manager.config_file.write_text(
+        '{"models": {"models": {"openai": {"plan": "old", "build": "old"}}}}'
+    )
+    reloaded = ConfigManager()
+    reloaded.config_dir = tmp_path
+    reloaded.config_file = manager.config_file
+    assert reloaded.load_config().models.models is ModelConfig().models
 
 
 def test_app_config():
@@ -40,6 +72,19 @@ def test_config_manager():
     assert hasattr(config, "models")
 
 
+def test_default_config_from_environment(monkeypatch):
+    """Test that the default config picks up auth from the environment."""
+    monkeypatch.setenv("OPSPILOT_API_KEY", "env-key")
+    monkeypatch.delenv("OPSPILOT_PROVIDER", raising=False)
+    auth = ConfigManager()._create_default_config().auth
+    assert (auth.api_key, auth.provider) == ("env-key", "openai")
+
+    monkeypatch.delenv("OPSPILOT_API_KEY")
+    monkeypatch.setenv("OPSPILOT_PROVIDER", "zhipu")
+    auth = ConfigManager()._create_default_config().auth
+    assert (auth.api_key, auth.provider) == (None, "zhipu")
+
+
 def test_get_model_for_mode():
     """Test model selection for different modes."""
     manager = ConfigManager()
@@ -70,5 +115,96 @@ def test_openrouter_support():
     assert litellm_config["api_base"] == "https://openrouter.ai/api/v1"
 
 
+def test_save_and_load_round_trip(tmp_path):
+    """Test that a saved configuration loads back unchanged."""
+    manager = ConfigManager()
+    manager.config_dir = tmp_path
+    manager.config_file = tmp_path / "config.json"
+
+    config = AppConfig(auth=AuthConfig(api_key="test", provider="anthropic"))
+    config.persist_history = True
+    manager.save_config(config)
+
+    reloaded = ConfigManager()
+    reloaded.config_dir = tmp_path
+    reloaded.config_file = manager.config_file
+    assert reloaded.load_config().dict() == config.dict()
+
+
+def test_load_config_cached_by_mtime(tmp_path):
+    """Test that managers share a parse until the file changes."""
+    import os
+
+    config_file = tmp_path / "config.json"
+    config_file.write_text('{"auth": {"provider": "zhipu"}}')
+
+    def load():
+        manager = ConfigManager()
+        manager.config_dir = tmp_path
+        manager.config_file = config_file
+        return manager.load_config()
+
+    first = load()
+    assert load() is first
+
+    config_file.write_text('{"auth": {"provider": "openai"}}')
+    os.utime(config_file, ns=(0, 0))
+    assert load().auth.provider == "openai"
+
+
+def test_migrates_legacy_yaml(tmp_path):
+    """Test that an old config.yaml is loaded and rewritten as JSON."""
+    (tmp_path / "config.yaml").write_text("auth:\n  provider: zhipu\ntimeout: 60\n")
+
+    manager = ConfigManager()
+    manager.config_dir = tmp_path
+    manager.config_file = tmp_path / "config.json"
+    manager._legacy_yaml = tmp_path / "config.yaml"
+    config = manager.load_config()
+
+    assert config.auth.provider == "zhipu"
+    assert config.timeout == 60
+    assert manager.config_file.exists()
+
+
+def test_warns_when_legacy_yaml_newer(tmp_path, caplog):
+    """Test that edits to config.yaml after migration are flagged."""
+    config_file = tmp_path / "config.json"
+    legacy_yaml = tmp_path / "config.yaml"
+    config_file.write_text(json.dumps({"auth": {"provider": "openai"}}))
+    legacy_yaml.write_text("auth:\n  provider: zhipu\n")
+    mtime = config_file.stat().st_mtime_ns
+    os.utime(legacy_yaml, ns=(mtime + 10**9, mtime + 10**9))
+
+    manager = ConfigManager()
+    manager.config_dir = tmp_path
+    manager.config_file = config_file
+    manager._legacy_yaml = legacy_yaml
+    with caplog.at_level(logging.WARNING, logger="opspilot.config"):
+        config = manager.load_config()
+
+    assert config.auth.provider == "openai"
+    assert "config.yaml is newer than" in caplog.text
+
+
+def test_example_config_loads():
+    """Test that the shipped example config is valid JSON for the loader."""
+    example = Path(opspilot.__file__).parent / "config.example.json"
+
+    config = _config_from_dict(json.loads(example.read_text()))
+
+    assert config.dict() == AppConfig().dict() | {
+        "auth": {"api_key": "your-api-key-here", "provider": "openai", "model": None}
+    }
+
+
+def test_get_config_manager_is_lazy_singleton():
+    """Test that the shared manager is created once and aliased as config_manager."""
+    from opspilot import config
+
+    assert config.get_config_manager() is config.get_config_manager()
+    assert config.config_manager is config.get_config_manager()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
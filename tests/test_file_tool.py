@@ -0,0 +1,282 @@
+"""
+Tests for OpsPilot File Tools
+"""
+
+import asyncio
+import os
+
+import pytest
+from opspilot.agent.tools import files
+from opspilot.agent.tools.files import FileTool
+
+
+@pytest.fixture
+def file_tool(tmp_path):
+    """Create a FileTool rooted in a temporary directory."""
+    return FileTool(base_path=str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_read_file(file_tool, tmp_path):
+    """Test reading a whole text file."""
+    (tmp_path / "notes.txt").write_text("one\ntwo\nthree\n")
+
+    result = await file_tool.read_file("notes.txt")
+
+    assert result["success"] is True
+    assert result["content"] == "one\ntwo\nthree\n"
+    assert result["lines_read"] == 3
+    assert result["total_lines"] == 3
+
+
+@pytest.mark.asyncio
+async def test_read_file_offset_and_limit(file_tool, tmp_path):
+    """Test reading a window of lines still reports the total line count."""
+    (tmp_path / "log.txt").write_text("".join(f"line {i}\n" for i in range(10)))
+
+    result = await file_tool.read_file("log.txt", offset=2, limit=3)
+
+    assert result["success"] is True
+    assert result["content"] == "line 2\nline 3\nline 4\n"
+    assert result["lines_read"] == 3
+    assert result["total_lines"] == 10
+
+    past_end = await file_tool.read_file("log.txt", offset=20)
+    assert past_end["content"] == ""
+    assert past_end["total_lines"] == 10
+
+    negative = await file_tool.read_file("log.txt", offset=-2)
+    assert negative["success"] is False
+    assert negative["error"] == "offset and limit must not be negative"
+
+
+@pytest.mark.asyncio
+async def test_read_large_file_mmap(file_tool, tmp_path, monkeypatch):
+    """Test that memory-mapped reads match ordinary text reads."""
+    monkeypatch.setattr(files, "MMAP_THRESHOLD", 0)
+    (tmp_path / "big.log").write_bytes(
+        "".join(f"línea {i}\r\n" for i in range(10)).encode()
+    )
+
+    result = await file_tool.read_file("big.log", offset=8)
+
+    assert result["content"] == "línea 8\nlínea 9\n"
+    assert result["lines_read"] == 2
+    assert result["total_lines"] == 10
+
+
+@pytest.mark.asyncio
+async def test_read_large_file_bare_carriage_returns(file_tool, tmp_path, monkeypatch):
+    """Test that bare carriage returns split lines on either read path."""
+    (tmp_path / "old.txt").write_bytes(b"one\rtwo\rthree\r")
+
+    small = await file_tool.read_file("old.txt", offset=1)
+    monkeypatch.setattr(files, "MMAP_THRESHOLD", 0)
+    large = await file_tool.read_file("old.txt", offset=1)
+
+    assert small["content"] == large["content"] == "two\nthree\n"
+    assert small["total_lines"] == large["total_lines"] == 3
+
+
+@pytest.mark.asyncio
+async def test_read_binary_file(file_tool, tmp_path):
+    """Test that files with NUL bytes are returned as raw bytes."""
+    data = b"\x00\x01" + b"x" * 2048
+    (tmp_path / "blob.bin").write_bytes(data)
+
+    result = await file_tool.read_file("blob.bin")
+
+    assert result["encoding"] == "binary"
+    assert result["content"] == data
+
+
+@pytest.mark.asyncio
+async def test_read_missing_file(file_tool):
+    """Test reading a file that doesn't exist."""
+    result = await file_tool.read_file("missing.txt")
+
+    assert result["success"] is False
+    assert result["error"] == "File not found"
+
+    result = await file_tool.read_file(".")
+    assert result["error"] == "Path is not a file"
+
+
+@pytest.mark.asyncio
+async def test_read_files(file_tool, tmp_path):
+    """Test reading several files returns results in request order."""
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+
+    results = await file_tool.read_files(["b.txt", "missing.txt", "a.txt"])
+
+    assert [r["success"] for r in results] == [True, False, True]
+    assert results[0]["content"] == "b"
+    assert results[2]["content"] == "a"
+
+
+@pytest.mark.asyncio
+async def test_read_restricted_path(file_tool, tmp_path):
+    """Test that restricted and out-of-tree paths are refused."""
+    for path in ("/etc/hostname", "/usr/share/dict/words"):
+        result = await file_tool.read_file(path)
+        assert result["success"] is False
+        assert result["error"] == "Access denied - path is restricted"
+
+    # Replacing the restricted paths takes effect immediately
+    (tmp_path / "secret").mkdir()
+    (tmp_path / "secret" / "key.txt").write_text("k")
+    assert (await file_tool.read_file("secret/key.txt"))["success"] is True
+    file_tool.restricted_paths = file_tool.restricted_paths | {str(tmp_path / "secret")}
+    result = await file_tool.read_file("secret/key.txt")
+    assert result["error"] == "Access denied - path is restricted"
+
+    # Symlinks are resolved before the check
+    (tmp_path / "etc-link").symlink_to("/etc")
+    result = await file_tool.read_file("etc-link/hostname")
+    assert result["error"] == "Access denied - path is restricted"
+
+
+@pytest.mark.asyncio
+async def test_write_file_with_backup(file_tool, tmp_path):
+    """Test writing a file keeps a backup of the previous content."""
+    (tmp_path / "config.yaml").write_text("old")
+
+    result = await file_tool.write_file("config.yaml", "new")
+
+    assert result["success"] is True
+    assert result["bytes_written"] == 3
+    assert (tmp_path / "config.yaml").read_text() == "new"
+    assert (tmp_path / "config.yaml.backup").read_text() == "old"
+
+    result = await file_tool.write_file("notes.txt", "café", backup=False, fsync=True)
+    assert result["bytes_written"] == len("café".encode("utf-8"))
+    assert result["backup_path"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_directory(file_tool, tmp_path):
+    """Test listing a directory skips hidden items unless asked."""
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / ".hidden").write_text("h")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.py").write_text("b")
+
+    result = await file_tool.list_directory()
+    assert result["success"] is True
+    items = {item["relative_path"]: item for item in result["items"]}
+    assert set(items) == {"a.txt", "sub"}
+    assert items["a.txt"]["is_file"] is True
+    assert items["a.txt"]["size"] == 1
+    assert items["a.txt"]["mime_type"] == "text/plain"
+    assert items["sub"]["is_dir"] is True
+
+    result = await file_tool.list_directory(show_hidden=True, recursive=True)
+    paths = {item["relative_path"] for item in result["items"]}
+    assert paths == {"a.txt", ".hidden", "sub", "sub/b.py"}
+
+
+@pytest.mark.asyncio
+async def test_list_directory_skips_unreadable_subdirectories(
+    file_tool, tmp_path, monkeypatch
+):
+    """Test that a recursive listing skips subdirectories it can't read."""
+    (tmp_path / "open").mkdir()
+    (tmp_path / "open" / "a.txt").write_text("a")
+    (tmp_path / "locked").mkdir()
+    (tmp_path / "locked" / "b.txt").write_text("b")
+    scandir = files.os.scandir
+
+    def guarded_scandir(path):
+        if os.path.basename(path) == "locked":
+            raise PermissionError(path)
+        return scandir(path)
+
+    monkeypatch.setattr(files.os, "scandir", guarded_scandir)
+
+    result = await file_tool.list_directory(recursive=True)
+    assert result["success"] is True
+    paths = {item["relative_path"] for item in result["items"]}
+    assert paths == {"open", "open/a.txt", "locked"}
+
+    result = await file_tool.list_directory("locked")
+    assert result["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_iter_directory(file_tool, tmp_path):
+    """Test iterating a directory lazily and its error cases."""
+    (tmp_path / "a.txt").write_text("a")
+
+    names = [item["name"] async for item in file_tool.iter_directory()]
+    assert names == ["a.txt"]
+
+    with pytest.raises(FileNotFoundError):
+        [item async for item in file_tool.iter_directory("missing")]
+
+    result = await file_tool.list_directory("a.txt")
+    assert result == {
+        "success": False,
+        "error": "Path is not a directory",
+        "dir_path": "a.txt",
+    }
+
+
+@pytest.mark.asyncio
+async def test_iter_directory_yields_to_loop(file_tool, tmp_path, monkeypatch):
+    """Test that a listing is scanned in batches off the event loop."""
+    monkeypatch.setattr(files, "SCAN_BATCH_SIZE", 2)
+    for i in range(5):
+        (tmp_path / f"{i}.txt").write_text("x")
+
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    ticker = asyncio.create_task(tick())
+    names = {item["name"] async for item in file_tool.iter_directory()}
+    ticker.cancel()
+
+    assert names == {f"{i}.txt" for i in range(5)}
+    assert ticks > 0
+
+
+@pytest.mark.asyncio
+async def test_iter_directory_closes_scan_early(file_tool, tmp_path, monkeypatch):
+    """Test that stopping a listing early closes the directory scan."""
+    monkeypatch.setattr(files, "SCAN_BATCH_SIZE", 1)
+    for i in range(3):
+        (tmp_path / f"{i}.txt").write_text("x")
+    closed = []
+    scan_directory = file_tool._scan_directory
+
+    def tracked_scan(*args):
+        try:
+            yield from scan_directory(*args)
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(file_tool, "_scan_directory", tracked_scan)
+
+    listing = file_tool.iter_directory()
+    async for _ in listing:
+        break
+    await listing.aclose()
+
+    assert closed == [True]
+
+
+def test_tool_definitions_shared():
+    """Test that the tool definitions are built once and reused."""
+    definitions = files.get_file_tool_definitions()
+    assert definitions is files.get_file_tool_definitions()
+    names = [d["function"]["name"] for d in definitions]
+    assert names == ["read_file", "read_files", "write_file", "list_directory"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -3,9 +3,11 @@ Tests for OpsPilot Memory Management
 """
 
 import pytest
+import sys
 import tempfile
 import shutil
-from opspilot.agent.memory import MemoryManager, ChatMessage
+from opspilot.agent import memory
+from opspilot.agent.memory import MemoryManager, ChatMessage, SNAPSHOT_INTERVAL
 
 
 @pytest.fixture
@@ -166,6 +168,177 @@ def test_list_sessions():
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
+def test_list_sessions_uses_index():
+    """Test that sessions are listed from the index and rebuilt without it."""
+    tmpdir = tempfile.mkdtemp()
+    try:
+        manager = MemoryManager(storage_dir=tmpdir)
+        session_id = manager.create_session("Indexed")
+        manager.add_message("user", "Hello")
+        manager.close()
+
+        # A fresh manager reads the index written by the first one
+        other = MemoryManager(storage_dir=tmpdir)
+        sessions = other.list_sessions()
+        assert [s["id"] for s in sessions] == [session_id]
+        assert sessions[0]["message_count"] == 1
+
+        # Without the index, summaries are rebuilt from the session files
+        (other.storage_dir / "_index.json").unlink()
+        rebuilt = MemoryManager(storage_dir=tmpdir)
+        assert rebuilt.list_sessions() == sessions
+        assert rebuilt.get_session_stats()["total_sessions"] == 1
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def test_messages_appended_to_log(memory_manager):
+    """Test that messages are appended to a log and compacted periodically."""
+    session_id = memory_manager.create_session("Log")
+    log_path = memory_manager.storage_dir / f"{session_id}.jsonl"
+
+    memory_manager.add_message("user", "first")
+    memory_manager.add_message("assistant", "second")
+    assert len(log_path.read_text().splitlines()) == 2
+
+    # Reloading merges the snapshot with the log
+    memory_manager.current_session = None
+    assert memory_manager.load_session(session_id)
+    assert [m.content for m in memory_manager.get_messages()] == ["first", "second"]
+
+    for i in range(SNAPSHOT_INTERVAL):
+        memory_manager.add_message("user", f"message {i}")
+    assert len(log_path.read_text().splitlines()) < SNAPSHOT_INTERVAL
+
+    memory_manager.close()
+    assert not log_path.exists()
+    memory_manager.current_session = None
+    assert memory_manager.load_session(session_id)
+    assert len(memory_manager.get_messages()) == SNAPSHOT_INTERVAL + 2
+
+
+def test_index_written_on_snapshot_not_append(memory_manager, monkeypatch):
+    """Test that appends update the index in memory only."""
+    memory_manager.create_session("Index")
+    writes = []
+    write_index = memory_manager._write_index
+    monkeypatch.setattr(
+        memory_manager, "_write_index", lambda: writes.append(1) or write_index()
+    )
+
+    for i in range(3):
+        memory_manager.add_message("user", f"message {i}")
+    assert writes == []
+    assert memory_manager.list_sessions()[0]["message_count"] == 3
+
+    memory_manager.close()
+    assert writes == [1]
+
+
+def test_resumed_log_counts_towards_snapshot(memory_manager):
+    """Test that a resumed session's logged messages count towards compaction."""
+    session_id = memory_manager.create_session("Resume")
+    log_path = memory_manager.storage_dir / f"{session_id}.jsonl"
+    for i in range(SNAPSHOT_INTERVAL - 1):
+        memory_manager.add_message("user", f"message {i}")
+    memory_manager._close_log()
+
+    resumed = MemoryManager(storage_dir=str(memory_manager.storage_dir))
+    assert resumed.load_session(session_id)
+    resumed.add_message("user", "one more")
+
+    assert not log_path.exists()
+    resumed.close()
+
+
+def test_torn_log_line_repaired_on_resume(memory_manager):
+    """Test that a partial last log line doesn't swallow later messages."""
+    session_id = memory_manager.create_session("Torn")
+    log_path = memory_manager.storage_dir / f"{session_id}.jsonl"
+    memory_manager.add_message("user", "first")
+    memory_manager._close_log()
+    # A crash mid-write leaves an unterminated fragment behind
+    with open(log_path, "ab") as f:
+        f.write(b'{"role": "user", "cont')
+
+    resumed = MemoryManager(storage_dir=str(memory_manager.storage_dir))
+    assert resumed.load_session(session_id)
+    resumed.add_message("user", "second")
+    assert resumed._log_count == 2
+    resumed._close_log()
+
+    reloaded = MemoryManager(storage_dir=str(memory_manager.storage_dir))
+    assert reloaded.load_session(session_id)
+    assert [m.content for m in reloaded.get_messages()] == ["first", "second"]
+
+
+def test_conversation_context_token_budget(memory_manager, monkeypatch):
+    """Test that context keeps system messages and the most recent history."""
+    monkeypatch.setattr(memory, "estimate_tokens", lambda content: 10)
+    memory_manager.create_session("Context")
+
+    memory_manager.add_message("system", "rules")
+    for i in range(5):
+        memory_manager.add_message("user", f"message {i}")
+
+    context = memory_manager.get_conversation_context(max_tokens=30)
+    assert [m["content"] for m in context] == ["rules", "message 3", "message 4"]
+    assert context[-1] == {"role": "user", "content": "message 4"}
+
+    # Token counts are cached on the messages, but never persisted
+    message = memory_manager.get_messages()[-1]
+    assert message._tokens == 10
+    assert "tokens" not in message.metadata
+    assert "_tokens" not in message.to_dict()
+
+
+def test_conversation_context_drops_orphaned_tool_results(memory_manager, monkeypatch):
+    """Test that context never starts with a tool result."""
+    monkeypatch.setattr(memory, "estimate_tokens", lambda content: 10)
+    memory_manager.create_session("Tools")
+
+    memory_manager.add_message("user", "read the file")
+    memory_manager.add_message(
+        "assistant", "", tool_calls=[{"id": "call_1", "function": {"name": "read"}}]
+    )
+    memory_manager.add_message("tool", "contents", tool_call_id="call_1")
+    memory_manager.add_message("assistant", "done")
+
+    context = memory_manager.get_conversation_context(max_tokens=20)
+    assert [m["content"] for m in context] == ["done"]
+
+
+def test_trim_keeps_system_messages(memory_manager):
+    """Test that trimming drops the oldest non-system messages."""
+    memory_manager.create_session("Trim")
+    memory_manager.max_messages_per_session = 3
+
+    memory_manager.add_message("system", "rules")
+    for i in range(4):
+        memory_manager.add_message("user", f"message {i}")
+
+    assert [m.content for m in memory_manager.get_messages()] == [
+        "rules",
+        "message 2",
+        "message 3",
+    ]
+
+
+async def test_async_wrappers(memory_manager):
+    """Test the non-blocking variants of add, load and list."""
+    session_id = memory_manager.create_session("Async")
+
+    msg_id = await memory_manager.aadd_message("user", "Hello")
+    assert msg_id is not None
+
+    memory_manager.current_session = None
+    assert await memory_manager.aload_session(session_id) is True
+    assert memory_manager.get_messages()[0].content == "Hello"
+
+    sessions = await memory_manager.alist_sessions()
+    assert sessions[0]["message_count"] == 1
+
+
 def test_export_session_json(memory_manager):
     """Test exporting a session as JSON."""
     session_id = memory_manager.create_session("Export Test")
@@ -204,6 +377,20 @@ def test_export_session_txt(memory_manager):
     assert "Hello" in exported
 
 
+def test_export_session_to_file(memory_manager, tmp_path):
+    """Test streaming an export to a file."""
+    session_id = memory_manager.create_session("File Export")
+    memory_manager.add_message("user", "Hello")
+
+    path = tmp_path / "export.md"
+    assert memory_manager.export_session_to(session_id, path, "markdown")
+    assert path.read_text(encoding="utf-8") == (
+        memory_manager.export_session(session_id, "markdown") + "\n"
+    )
+
+    assert not memory_manager.export_session_to(session_id, path, "html")
+
+
 def test_get_session_stats_no_session():
     """Test getting stats when no session is active."""
     # Create fresh memory manager with isolated storage
@@ -272,7 +459,7 @@ def test_message_from_dict():
 
     data = {
         "id": msg_id,
-        "role": "assistant",
+        "role": "".join(["assis", "tant"]),
         "content": "Response",
         "timestamp": now,
         "tool_calls": None,
@@ -282,9 +469,21 @@ def test_message_from_dict():
 
     msg = ChatMessage.from_dict(data)
     assert msg.role == "assistant"
+    assert msg.role is sys.intern("assistant")
     assert msg.content == "Response"
     assert msg.timestamp == now
 
 
+def test_get_memory_manager_is_lazy_singleton(monkeypatch, tmp_path):
+    """Test that the shared manager is created once and aliased as memory_manager."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    memory.get_memory_manager.cache_clear()
+    try:
+        assert memory.get_memory_manager() is memory.get_memory_manager()
+        assert memory.memory_manager is memory.get_memory_manager()
+    finally:
+        memory.get_memory_manager.cache_clear()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,143 @@
+"""
+Tests for OpsPilot Response Cache
+"""
+
+import pytest
+from opspilot.agent.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    hash_tools,
+    make_cache_key,
+    token_similarity,
+    tokenize_prompt,
+)
+
+
+def _key(content, model="gpt-4o", mode="plan"):
+    messages = [{"role": "user", "content": content}]
+    return make_cache_key(model, mode, messages, None, 0.7, 4000)
+
+
+def test_cache_key_canonicalization():
+    """Test that trivially different prompts share a cache key."""
+    assert _key("List the pods") == _key("  list   the pods ")
+    assert _key("list pods") != _key("list nodes")
+
+    # Punctuation distinguishes hosts, addresses and paths
+    assert _key("ping 10.0.0.1") != _key("ping 100.0.1")
+    assert _key("restart web-1") != _key("restart web1")
+    assert _key("cat /etc/hosts") != _key("cat etchosts")
+
+
+def test_cache_key_includes_model_and_mode():
+    """Test that model and mode are part of the cache key."""
+    assert _key("list pods", model="gpt-4o") != _key("list pods", model="gpt-4o-mini")
+    assert _key("list pods", mode="plan") != _key("list pods", mode="build")
+
+
+def test_cache_key_precomputed_tools_hash():
+    """Test that a precomputed tools hash gives the same key."""
+    messages = [{"role": "user", "content": "list pods"}]
+    tools = [{"type": "function", "function": {"name": "read_file"}}]
+
+    key = make_cache_key("gpt-4o", "plan", messages, tools, 0.7, 4000)
+    precomputed = make_cache_key(
+        "gpt-4o", "plan", messages, tools, 0.7, 4000, tools_hash=hash_tools(tools)
+    )
+    assert key == precomputed
+    assert key != make_cache_key("gpt-4o", "plan", messages, None, 0.7, 4000)
+
+
+def test_cache_get_set():
+    """Test storing and retrieving a response."""
+    cache = ResponseCache()
+    key = _key("hello")
+
+    assert cache.get(key) is None
+
+    cache.set(key, CachedResponse(content="Hi there!", total_tokens=12))
+    cached = cache.get(key)
+    assert cached is not None
+    assert cached.content == "Hi there!"
+    assert cached.total_tokens == 12
+
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted."""
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", CachedResponse(content="A"))
+    cache.set("b", CachedResponse(content="B"))
+
+    # Touch "a" so "b" becomes least recently used
+    assert cache.get("a") is not None
+    cache.set("c", CachedResponse(content="C"))
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_cache_ttl_expiry():
+    """Test that expired entries are not returned."""
+    cache = ResponseCache(ttl=-1)
+    cache.set("a", CachedResponse(content="A"))
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_token_similarity():
+    """Test similarity over ordered prompt tokens."""
+    a = tokenize_prompt("show the pods in the default namespace")
+    b = tokenize_prompt("Show the pods in the default namespace!")
+    c = tokenize_prompt("delete the deployment")
+
+    assert token_similarity(a, b) == 1.0
+    assert token_similarity(a, c) < 0.5
+
+    # Word order carries the direction of an operation
+    forward = tokenize_prompt("copy the prod database to staging")
+    backward = tokenize_prompt("copy the staging database to prod")
+    assert token_similarity(forward, backward) < 0.85
+
+    # Prompts with no tokens never match
+    assert token_similarity(tokenize_prompt("?"), tokenize_prompt("👍")) == 0.0
+
+
+def test_cache_find_similar():
+    """Test fuzzy lookup of near-duplicate prompts within a scope."""
+    cache = ResponseCache(similarity_threshold=0.8)
+    prompt = "list all pods in the kube-system namespace of the cluster now"
+    cache.set("a", CachedResponse(content="pods"), scope="ctx", prompt=prompt)
+
+    similar = "list all pods in the kube-system namespace of the cluster please"
+    cached = cache.find_similar("ctx", similar)
+    assert cached is not None
+    assert cached.content == "pods"
+
+    # Different context or unrelated prompt must miss
+    assert cache.find_similar("other-ctx", similar) is None
+    assert cache.find_similar("ctx", "restart the nginx deployment") is None
+
+
+def test_cache_find_similar_skips_different_lengths():
+    """Test that prompts of very different length never match."""
+    cache = ResponseCache(similarity_threshold=0.5)
+    cache.set("a", CachedResponse(content="short"), scope="ctx", prompt="list pods")
+
+    long_prompt = "list pods in every namespace and show their restart counts"
+    assert cache.find_similar("ctx", long_prompt) is None
+    assert cache.find_similar("ctx", "list the pods") is not None
+
+
+def test_cache_find_similar_empty_prompt():
+    """Test that prompts without tokens never get a fuzzy hit."""
+    cache = ResponseCache()
+    cache.set("a", CachedResponse(content="thanks"), scope="ctx", prompt="👍")
+
+    assert cache.find_similar("ctx", "?") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
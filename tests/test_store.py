@@ -0,0 +1,64 @@
+"""
+Tests for OpsPilot Conversation Store
+"""
+
+import pytest
+from opspilot.agent.core import AgentCore, RECENT_MESSAGES
+from opspilot.agent.store import ConversationStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a store backed by a temporary database."""
+    store = ConversationStore(str(tmp_path / "agent.db"))
+    yield store
+    store.close()
+
+
+def test_append_and_recent(store):
+    """Test that recent messages come back in chronological order."""
+    store.append("user", "first")
+    store.append(
+        "assistant",
+        "",
+        tool_calls=[{"id": "1", "function": {"name": "read", "arguments": "{}"}}],
+    )
+    store.append("tool", "result", tool_call_id="1")
+
+    recent = store.recent(2)
+    assert [m["role"] for m in recent] == ["assistant", "tool"]
+    assert recent[0]["tool_calls"][0]["function"]["name"] == "read"
+    assert recent[1]["tool_call_id"] == "1"
+
+
+def test_usage_round_trip(store):
+    """Test saving and loading usage statistics."""
+    assert store.load_usage() == {}
+
+    store.save_usage({"total_tokens": 42, "total_cost": 0.5})
+    assert store.load_usage() == {"total_tokens": 42, "total_cost": 0.5}
+
+
+def test_agent_resumes_from_store(tmp_path):
+    """Test that an agent resumes the recent tail of a persisted session."""
+    db_path = str(tmp_path / "agent.db")
+
+    store = ConversationStore(db_path)
+    agent = AgentCore(store=store)
+    for i in range(RECENT_MESSAGES + 5):
+        agent.add_message("user", f"message {i}")
+    assert len(agent.messages) == RECENT_MESSAGES
+    store.close()
+
+    store = ConversationStore(db_path)
+    resumed = AgentCore(store=store)
+    assert len(resumed.messages) == RECENT_MESSAGES
+    assert resumed.messages[-1].content == f"message {RECENT_MESSAGES + 4}"
+
+    resumed.clear_history()
+    assert store.recent(RECENT_MESSAGES) == []
+    store.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
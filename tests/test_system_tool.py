@@ -3,7 +3,7 @@ Tests for OpsPilot System Tools
 """
 
 import pytest
-from opspilot.agent.tools.system import SystemTool
+from opspilot.agent.tools.system import SystemTool, get_system_tool_definition
 
 
 @pytest.fixture
@@ -40,6 +40,19 @@ async def test_command_timeout(system_tool):
     assert "timed out" in result["error"].lower()
 
 
+@pytest.mark.asyncio
+async def test_output_capped(system_tool):
+    """Test that captured output is truncated at max_output_bytes."""
+    result = await system_tool.execute_command(
+        "python -c \"print('x' * 100)\"", max_output_bytes=10
+    )
+
+    assert result["success"] is True
+    assert result["stdout"] == "x" * 10
+    assert result["stdout_truncated"] is True
+    assert result["stderr_truncated"] is False
+
+
 @pytest.mark.asyncio
 async def test_dangerous_command_detection(system_tool):
     """Test that dangerous commands are detected."""
@@ -61,6 +74,75 @@ async def test_dangerous_command_detection(system_tool):
     assert result["success"] is False
 
 
+@pytest.mark.asyncio
+async def test_dangerous_keyword_reported(system_tool):
+    """Test that the most specific dangerous keyword is reported."""
+    keywords = []
+
+    async def mock_confirmation(command, keyword):
+        keywords.append(keyword)
+        return False
+
+    system_tool.confirmation_callback = mock_confirmation
+
+    await system_tool.execute_command("Docker RM my-container")
+    await system_tool.execute_command("echo hello")
+    await system_tool.execute_command("echo charmander")
+    await system_tool.execute_command("ls;sudo reboot")
+
+    assert keywords == ["docker rm", "sudo"]
+
+
+@pytest.mark.parametrize(
+    "command, keyword",
+    [
+        ("rmdir /tmp/build", "rm"),
+        ("userdel deploy", "userdel"),
+        ("chpasswd < users.txt", "chpasswd"),
+        ("sudoedit /etc/hosts", "sudo"),
+        ("helmfile destroy", "helm"),
+        ("gpasswd -d deploy docker", "passwd"),
+        ("smbpasswd -a deploy", "passwd"),
+        ("cat /etc/sudoers", "sudo"),
+        ("telinit 0", "init"),
+        ("sfdisk /dev/sda", "fdisk"),
+        ("cfdisk", "fdisk"),
+    ],
+)
+def test_dangerous_command_prefixes(system_tool, command, keyword):
+    """Test that commands starting with a dangerous keyword are flagged."""
+    assert system_tool._is_dangerous(command) == keyword
+
+
+def test_safe_command_not_flagged(system_tool):
+    """Test that keywords inside other words are not flagged."""
+    assert system_tool._is_dangerous("echo charmander farm") is None
+    assert system_tool._is_dangerous("tmux attach -t build") is None
+    assert system_tool._is_dangerous("git submodule summary") is None
+
+
+@pytest.mark.asyncio
+async def test_unparsable_command_not_confirmed(system_tool):
+    """Test that a command that can't be split fails before confirmation."""
+    calls = []
+
+    async def mock_confirmation(command, keyword):
+        calls.append(command)
+        return True
+
+    system_tool.confirmation_callback = mock_confirmation
+
+    result = await system_tool.execute_command("rm 'unterminated")
+
+    assert result["success"] is False
+    assert "quotation" in result["error"]
+    assert calls == []
+
+    result = await system_tool.execute_command(["echo", "sudo"])
+    assert result["success"] is True
+    assert calls == [["echo", "sudo"]]
+
+
 @pytest.mark.asyncio
 async def test_dangerous_command_allowed(system_tool):
     """Test that dangerous commands can be allowed."""
@@ -108,6 +190,51 @@ async def test_check_command_exists(system_tool):
     assert exists is False
 
 
+@pytest.mark.asyncio
+async def test_kill_process(system_tool):
+    """Test that killing a tracked process waits for it to exit."""
+    import subprocess
+    import sys
+
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    system_tool.running_processes["sleeper"] = process
+
+    assert await system_tool.kill_process("sleeper") is True
+    assert process.poll() is not None
+    assert system_tool.get_process_list() == []
+    assert await system_tool.kill_process("sleeper") is False
+
+
+def test_wait_or_kill_force_kills():
+    """Test that a process ignoring SIGTERM is killed after the timeout."""
+    import subprocess
+    import sys
+    import time
+
+    from opspilot.agent.tools.system import _wait_or_kill
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import signal, sys, time;"
+            "signal.signal(signal.SIGTERM, signal.SIG_IGN);"
+            "print(flush=True); time.sleep(30)",
+        ],
+        stdout=subprocess.PIPE,
+    )
+    # Wait until the handler is installed
+    process.stdout.readline()
+    process.terminate()
+
+    start = time.monotonic()
+    _wait_or_kill(process, 0.2)
+
+    assert process.poll() is not None
+    assert time.monotonic() - start < 5
+    process.stdout.close()
+
+
 def test_get_system_info(system_tool):
     """Test getting system information."""
     info = system_tool.get_system_info()
@@ -126,5 +253,29 @@ def test_dangerous_keywords_list(system_tool):
     assert "docker rm" in system_tool.dangerous_keywords
 
 
+@pytest.mark.asyncio
+async def test_dangerous_keywords_replaced(system_tool):
+    """Test that replacing the dangerous keywords takes effect immediately."""
+    keywords = []
+
+    async def mock_confirmation(command, keyword):
+        keywords.append(keyword)
+        return False
+
+    system_tool.confirmation_callback = mock_confirmation
+
+    system_tool.dangerous_keywords = system_tool.dangerous_keywords | {"curl"}
+    await system_tool.execute_command("curl https://example.com")
+
+    assert keywords == ["curl"]
+
+
+def test_tool_definition_shared():
+    """Test that the tool definition is built once and reused."""
+    definition = get_system_tool_definition()
+    assert definition is get_system_tool_definition()
+    assert definition["function"]["name"] == "execute_command"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
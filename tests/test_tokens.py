@@ -0,0 +1,30 @@
+"""
+Tests for OpsPilot Token Estimation
+"""
+
+import threading
+import time
+
+from opspilot.agent import tokens
+
+
+def test_stalled_encoder_load_falls_back(monkeypatch):
+    """Test that a hanging encoder download doesn't block estimation."""
+    release = threading.Event()
+
+    def stalled_load():
+        release.wait(5)
+
+    monkeypatch.setattr(tokens, "_encode", None)
+    monkeypatch.setattr(tokens, "_encoder_ready", threading.Event())
+    monkeypatch.setattr(tokens, "_encoder_started", False)
+    monkeypatch.setattr(tokens, "_load_encoder", stalled_load)
+    monkeypatch.setattr(tokens, "ENCODER_LOAD_TIMEOUT_SECS", 0.05)
+
+    start = time.monotonic()
+    assert tokens.estimate_tokens("x" * 40) == 11
+    # Later calls don't wait again while the load is still running
+    assert tokens.estimate_tokens("x" * 40) == 11
+    assert time.monotonic() - start < 1
+
+    release.set()